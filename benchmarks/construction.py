@@ -0,0 +1,133 @@
+"""Product construction benchmark over synthetic Faker feeds.
+
+    python -m benchmarks.construction --save benchmarks/baseline.json
+    python -m benchmarks.construction --check benchmarks/baseline.json --threshold 0.2
+"""
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterator
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+
+from faker import Faker
+
+from product_feed.model.google import Product
+from product_feed.testing import base_row, full_row, typical_row
+
+PROFILES: dict[str, Callable[[Faker], dict]] = {
+    'minimal': base_row,
+    'typical': typical_row,
+    'full': full_row,
+}
+SIZES = (10_000, 100_000, 1_000_000)
+POOL_SIZE = 1000
+FIELD_SAMPLE = 1000
+MEMORY_ROWS = 10_000
+
+def generate(profile: str, size: int, seed: int = 0) -> Iterator[dict]:
+    # Faker is far slower than validation, so a fixed pool of rows is cycled with unique ids
+    f = Faker()
+    f.seed_instance(seed)
+    pool = [PROFILES[profile](f) for _ in range(min(size, POOL_SIZE))]
+    for i in range(size):
+        yield {**pool[i % len(pool)], 'id': str(i)}
+
+def measure_throughput(rows: Iterator[dict]) -> tuple[int, float]:
+    n = 0
+    start = perf_counter()
+    for row in rows:
+        Product(**row)
+        n += 1
+    return n, perf_counter() - start
+
+def measure_fields(rows: list[dict]) -> dict[str, float]:
+    # Microseconds per call of each field's validation chain (pre validators, type coercion, validators)
+    costs = {}
+    for name, field in Product.__fields__.items():
+        values = [row[name] for row in rows if name in row]
+        if not values:
+            continue
+        start = perf_counter()
+        for v in values:
+            field.validate(v, {}, loc=name, cls=Product)
+        costs[name] = (perf_counter() - start) / len(values) * 1e6
+    return dict(sorted(costs.items(), key=lambda kv: kv[1], reverse=True))
+
+def measure_memory(rows: Iterator[dict]) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        products = [Product(**row) for row in rows]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, len(products)
+
+def run(profile: str, size: int) -> dict:
+    n, elapsed = measure_throughput(generate(profile, size))
+    peak, retained = measure_memory(generate(profile, min(size, MEMORY_ROWS)))
+    return {
+        'profile': profile,
+        'rows': n,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(n / elapsed, 1),
+        'peak_memory': peak,
+        'peak_memory_per_row': round(peak / retained, 1),
+        'field_us': {k: round(v, 2) for k, v in measure_fields(list(generate(profile, FIELD_SAMPLE))).items()},
+    }
+
+def compare(baseline: dict, results: dict, threshold: float) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get('results', {}).get(key)
+        if base is None:
+            continue
+        floor = base['rows_per_second'] * (1 - threshold)
+        if result['rows_per_second'] < floor:
+            regressions.append(
+                f"{key}: {result['rows_per_second']:.0f} rows/s is below {floor:.0f} "
+                f"({base['rows_per_second']:.0f} baseline - {threshold:.0%})"
+            )
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    parser.add_argument('--save', metavar='PATH', help='write results as a new baseline')
+    parser.add_argument('--check', metavar='PATH', help='fail when throughput regressed against this baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed throughput drop, default 0.2')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for profile in args.profiles:
+        for size in args.sizes:
+            result = results[f'{profile}-{size}'] = run(profile, size)
+            slowest = ', '.join(f'{k} {v}us' for k, v in islice(result['field_us'].items(), 3))
+            print(
+                f"{profile:>8} {size:>9}: {result['rows_per_second']:>10.0f} rows/s, "
+                f"{result['peak_memory_per_row']:>8.0f} B/row, slowest fields: {slowest}"
+            )
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2)
+            f.write('\n')
+
+    if args.check:
+        with open(args.check) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
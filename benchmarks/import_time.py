@@ -0,0 +1,63 @@
+"""Cold import time of the package modules, each measured in a fresh interpreter.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 20 --check 150
+"""
+from statistics import median
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ('pydantic', 'product_feed.model.google', 'product_feed.feed.reader')
+# Dependencies that should only be loaded once something needs them
+DEFERRED = ('dateutil.parser', 'iso4217', 'iso3166', 'numpy', 'product_feed.model.catalog')
+RUNS = 10
+
+_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, *[m for m in {deferred!r} if m in sys.modules])
+'''
+
+def measure(module: str, runs: int = RUNS) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    code = _PROBE.format(module=module, deferred=DEFERRED)
+    # The first run writes bytecode, so compiling the sources is not counted
+    subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True, text=True).stdout.split()
+        timings.append(float(out[0]))
+        loaded = out[1:]
+    return {
+        'module': module,
+        'median_ms': round(median(timings) * 1e3, 1),
+        'min_ms': round(min(timings) * 1e3, 1),
+        'loaded': loaded,
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=list(MODULES))
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--check', type=float, metavar='MS', help='fail when any median exceeds this many milliseconds')
+    args = parser.parse_args(argv)
+
+    slow = []
+    for module in args.modules:
+        result = measure(module, args.runs)
+        loaded = ', '.join(result['loaded']) or '-'
+        print(f"{module:>28}: {result['median_ms']:>7.1f}ms median, {result['min_ms']:>7.1f}ms min, also loaded: {loaded}")
+        if args.check is not None and result['median_ms'] > args.check:
+            slow.append(module)
+
+    for module in slow:
+        print(f'REGRESSION {module} imports in more than {args.check}ms', file=sys.stderr)
+    return 1 if slow else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
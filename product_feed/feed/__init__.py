@@ -0,0 +1,39 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .reader import FeedReader, FeedRow
+    from .source import FeedSource
+    from .cache import ValidationCache
+    from .parallel import ParallelValidator
+    from .delta import DeltaEngine, DeltaState
+    from .writer import RssWriter, TsvWriter
+    from .shards import ShardedWriter
+    from .pipeline import Pipeline
+    from .supplemental import SupplementalMerger
+
+# Imported on first access, so e.g. reading a feed does not pay for numpy via the batch validator
+_EXPORTS = {
+    'FeedReader': '.reader',
+    'FeedRow': '.reader',
+    'FeedSource': '.source',
+    'ValidationCache': '.cache',
+    'ParallelValidator': '.parallel',
+    'DeltaEngine': '.delta',
+    'DeltaState': '.delta',
+    'RssWriter': '.writer',
+    'TsvWriter': '.writer',
+    'ShardedWriter': '.shards',
+    'Pipeline': '.pipeline',
+    'SupplementalMerger': '.supplemental',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
@@ -0,0 +1,195 @@
+from enum import Enum
+from typing import Mapping, NamedTuple, Sequence
+
+from pydantic import BaseModel, ValidationError, validate_model
+from pydantic.error_wrappers import ErrorWrapper
+
+from ..model.google import GTIN_LENGTHS, MAX_LENGTH, Product, gtin_check_digit
+from .prescreen import ENUM_VALUES, bad_gtin, gtin_digits, missing, not_allowed, too_long
+from .reader import FeedRow, validate_row
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LENGTH_FIELDS = (
+    'id', 'title', 'description', 'brand', 'mpn', 'material', 'pattern', 'size', 'item_group_id',
+    'custom_label_0', 'custom_label_1', 'custom_label_2', 'custom_label_3', 'custom_label_4',
+    'shipping_label', 'transit_time_label', 'tax_category',
+)
+
+ENUM_FIELDS: dict[str, type[Enum]] = {field: Product.__fields__[field].type_ for field in ENUM_VALUES}
+
+class BatchResult(NamedTuple):
+    valid: Sequence[bool]
+    errors: dict[int, list[ErrorWrapper]]
+
+def _required(field: str) -> bool:
+    return Product.__fields__[field].required
+
+def check_length(column: Sequence[str], limit: int, required: bool = False) -> Sequence[bool]:
+    n = len(column)
+    if np is not None:
+        lengths = np.fromiter(map(len, column), dtype=np.int64, count=n)
+        ok = lengths <= limit
+        if required:
+            ok &= lengths > 0
+        return ok
+    if required:
+        return [0 < len(v) <= limit for v in column]
+    return [len(v) <= limit for v in column]
+
+def check_enum(column: Sequence[str], enum: type[Enum], required: bool = False) -> Sequence[bool]:
+    allowed = {e.value for e in enum}
+    if not required:
+        allowed.add('')
+    if np is not None:
+        return np.fromiter(map(allowed.__contains__, column), dtype=bool, count=len(column))
+    return list(map(allowed.__contains__, column))
+
+if np is not None:
+    # Digit weights for each GTIN length, counted from the right the check digit weighs 1,
+    # then 3, 1, 3, ... and the padding after the GTIN weighs 0
+    _GTIN_WEIGHTS = np.array(
+        [[1 + 2 * ((length - 1 - j) & 1) if j < length else 0 for j in range(14)] for length in range(15)],
+        dtype=np.int16,
+    )
+
+def check_gtin(column: Sequence[str], required: bool = False) -> Sequence[bool]:
+    # Same rules as Product.gtin_format: non-digits are dropped, then length and GS1 check digit
+    digits = list(map(gtin_digits, column))
+    if np is None:
+        return [
+            (v == '' and not required) or (len(d) in GTIN_LENGTHS and gtin_check_digit(d))
+            for v, d in zip(column, digits)
+        ]
+
+    n = len(column)
+    lengths = np.fromiter(map(len, digits), dtype=np.int64, count=n)
+    # One row of UCS-4 code points per GTIN, left aligned and null padded. Longer values are cut
+    # off but already fail on their length
+    codes = np.array(digits, dtype='U14').view(np.uint32).reshape(n, 14) - np.uint32(ord('0'))
+    weights = _GTIN_WEIGHTS[np.minimum(lengths, 14)]
+    # Non-ASCII digits pass isdigit() but are rejected by gtin_check_digit()
+    ascii = ~((codes > 9) & (weights > 0)).any(axis=1)
+    total = np.einsum('ij,ij->i', codes.astype(np.int16), weights, dtype=np.int32)
+    ok = np.isin(lengths, GTIN_LENGTHS) & ascii & (total % 10 == 0)
+    if not required:
+        for i in np.flatnonzero(lengths == 0):
+            ok[i] = column[i] == ''
+    return ok
+
+def _failures(ok: Sequence[bool]) -> Sequence[int]:
+    if np is not None:
+        return np.flatnonzero(~ok).tolist()
+    return [i for i, v in enumerate(ok) if not v]
+
+def validate_columns(columns: Mapping[str, Sequence[str]], size: int) -> BatchResult:
+    # Missing cells are expected as '' so every column is exactly `size` long
+    errors: dict[int, list[ErrorWrapper]] = {}
+
+    def fail(i, rejection):
+        errors.setdefault(i, []).append(rejection.wrapper())
+
+    for field in LENGTH_FIELDS:
+        column = columns.get(field)
+        if column is None:
+            continue
+        for i in _failures(check_length(column, MAX_LENGTH[field], _required(field))):
+            fail(i, missing(field) if column[i] == '' else too_long(field))
+
+    for field, enum in ENUM_FIELDS.items():
+        column = columns.get(field)
+        if column is None:
+            continue
+        for i in _failures(check_enum(column, enum, _required(field))):
+            fail(i, missing(field) if column[i] == '' else not_allowed(field))
+
+    column = columns.get('gtin')
+    if column is not None:
+        for i in _failures(check_gtin(column, _required('gtin'))):
+            fail(i, missing('gtin') if column[i] == '' else bad_gtin(gtin_digits(column[i])))
+
+    if np is not None:
+        valid = np.ones(size, dtype=bool)
+        valid[list(errors)] = False
+    else:
+        valid = [i not in errors for i in range(size)]
+    return BatchResult(valid, errors)
+
+class _Builder:
+    # Builds a model from a row that passed validate_columns. Only the unchecked
+    # fields go through pydantic: a checked string is kept as it is, an enum looked up by value and
+    # a GTIN reduced to its digits, which is all their validators would still do
+    def __init__(self, model: type[Product]):
+        self.model = model
+        fields = model.__fields__
+        self.strings = tuple(f for f in LENGTH_FIELDS if f in fields)
+        self.enums = {f: enum for f, enum in ENUM_FIELDS.items() if f in fields}
+        self.checked = frozenset((*self.strings, *self.enums, 'gtin'))
+        self.defaults = {f: fields[f].default for f in self.checked}
+        # A subclass validating the other fields, with the validators and config of the model
+        self.rest = type(model.__name__, (model,), {'__module__': model.__module__})
+        self.rest.__fields__ = {name: field for name, field in fields.items() if name not in self.checked}
+
+    @classmethod
+    def supports(cls, model: type[BaseModel]) -> bool:
+        # Models with their own __init__, such as LazyProduct, or their own validators on a checked field
+        # are constructed as usual
+        if not issubclass(model, Product) or model.__init__ is not Product.__init__:
+            return False
+        fields = model.__fields__
+        return all(
+            fields[f].class_validators.keys() == Product.__fields__[f].class_validators.keys()
+            for f in (*LENGTH_FIELDS, *ENUM_FIELDS, 'gtin')
+        )
+
+    def __call__(self, line: int, raw: dict[str, str]) -> FeedRow:
+        checked = self.checked & raw.keys()
+        if any(raw[f] == '' for f in checked):
+            # pydantic keeps '' in a str field but rejects it as an enum or GTIN
+            return validate_row(self.model, line, raw)
+        values, fields_set, error = validate_model(self.rest, raw)
+        if error is not None:
+            return FeedRow(line, None, ValidationError(error.raw_errors, self.model))
+
+        get = raw.get
+        defaults = self.defaults
+        for f in self.strings:
+            values[f] = get(f, defaults[f])
+        for f, enum in self.enums.items():
+            value = get(f)
+            values[f] = defaults[f] if value is None else enum(value)
+        if 'gtin' in defaults:
+            value = get('gtin')
+            values['gtin'] = defaults['gtin'] if value is None else [gtin_digits(value)]
+        values = {name: values[name] for name in self.model.__fields__}
+        return FeedRow(line, self.model.construct(fields_set | checked, **values), None)
+
+_builders: dict[type[BaseModel], _Builder] = {}
+
+def validate_batch(rows: Sequence[tuple[int, dict[str, str]]], model: type[BaseModel] = Product) -> list[FeedRow]:
+    """Validates a chunk of feed rows, checking the plain string, enum and GTIN fields a column at a time.
+
+    Rows failing those checks report every column error, with the reasons the pre-screen gives for the
+    same rules, and are never constructed. The rest are built validating only the fields the columns did
+    not cover. Those fields hold most of the cost of a row (URLs, amounts, dates, shipping), so a valid
+    row is only about 10% cheaper than `validate_row`; the large saving is on rejected rows.
+    """
+    fields = [f for f in (*LENGTH_FIELDS, *ENUM_FIELDS, 'gtin') if f in model.__fields__]
+    columns = {f: [raw.get(f, '') for _, raw in rows] for f in fields}
+    errors = validate_columns(columns, len(rows)).errors
+
+    build = _builders.get(model)
+    if build is None and _Builder.supports(model):
+        build = _builders[model] = _Builder(model)
+    results = []
+    for i, (line, raw) in enumerate(rows):
+        if i in errors:
+            results.append(FeedRow(line, None, ValidationError(errors[i], model)))
+        elif build is not None:
+            results.append(build(line, raw))
+        else:
+            results.append(validate_row(model, line, raw))
+    return results
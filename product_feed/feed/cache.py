@@ -0,0 +1,200 @@
+"""Persistent cache of validated rows, so a nightly run only validates what changed.
+
+Rows are keyed by a blake2b digest of their raw values and stored in SQLite. A valid
+row is kept as the pickled tuple of its field values and rebuilt with
+TrustedConstructor, a rejected row as its pickled ValidationError. Each run that
+opens the cache is a new generation, and rows not seen in the last `max_age`
+generations are evicted when it closes. The cache embeds pickled values, so only
+open files written by a trusted process.
+"""
+from hashlib import blake2b
+from itertools import chain, islice
+from os import PathLike
+from time import perf_counter
+from typing import Iterable, Iterator
+import os
+import pickle
+import sqlite3
+
+from pydantic import BaseModel
+
+from ..model.google import Product
+from ..model.trusted import TrustedConstructor
+from . import prescreen as _prescreen
+from .reader import FeedRow, validate_row
+
+DIGEST_SIZE = 16
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS rows (
+    hash BLOB PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rows_generation ON rows (generation);
+'''
+
+def row_hash(raw: dict[str, str]) -> bytes:
+    # Sorted, so a row hashes the same whatever the column order of the feed
+    return blake2b('\x00'.join(chain.from_iterable(sorted(raw.items()))).encode(), digest_size=DIGEST_SIZE).digest()
+
+def model_signature(model: type[BaseModel], version: str = '') -> str:
+    fields = ','.join(f'{name}:{field.outer_type_!r}' for name, field in model.__fields__.items())
+    return blake2b(f'{model.__module__}:{model.__qualname__}|{version}|{fields}'.encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+class CacheStats:
+    def __init__(self, generation: int, validate_cost: float = 0.0):
+        self.generation = generation
+        # Mean seconds to validate a row in the last run that had misses
+        self.previous_cost = validate_cost
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        # Time spent decoding hits and validating misses
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        rows = self.hits + self.misses
+        return self.hits / rows if rows else 0.0
+
+    @property
+    def validate_cost(self) -> float:
+        return self.miss_time / self.misses if self.misses else self.previous_cost
+
+    @property
+    def saved(self) -> float:
+        # What the hits would have cost to validate, less what decoding them did cost
+        if not self.hits:
+            return 0.0
+        return self.hits * self.validate_cost - self.hit_time
+
+    def __repr__(self):
+        return (
+            f'CacheStats(generation={self.generation}, hits={self.hits}, misses={self.misses}, '
+            f'hit_rate={self.hit_rate:.3f}, stored={self.stored}, evicted={self.evicted}, saved={self.saved:.3f})'
+        )
+
+class ValidationCache:
+    def __init__(
+        self,
+        path: str | PathLike,
+        model: type[BaseModel] = Product,
+        max_age: int = 3,
+        version: str = '',
+        batch_size: int = 512,
+    ):
+        # Bump version whenever validators change what they accept or produce, which drops every cached row
+        self.path = os.fspath(path)
+        self.model = model
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.trusted = TrustedConstructor(model)
+        self.fields = self.trusted.fields
+
+        self._db = sqlite3.connect(self.path)
+        self._db.execute('PRAGMA journal_mode = WAL')
+        self._db.execute('PRAGMA synchronous = NORMAL')
+        self._db.executescript(_SCHEMA)
+        meta = dict(self._db.execute('SELECT key, value FROM meta'))
+        signature = model_signature(model, version)
+        if meta.get('signature') != signature:
+            self._db.execute('DELETE FROM rows')
+        self.generation = int(meta.get('generation', 0)) + 1
+        self._db.executemany(
+            'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+            [('signature', signature), ('generation', str(self.generation))],
+        )
+        self._db.commit()
+        self.stats = CacheStats(self.generation, float(meta.get('validate_cost', 0.0)))
+        self._closed = False
+
+    def _lookup(self, hashes: list[bytes]) -> dict[bytes, tuple[int, bytes]]:
+        query = f'SELECT hash, valid, data FROM rows WHERE hash IN ({",".join("?" * len(hashes))})'
+        return {h: (valid, data) for h, valid, data in self._db.execute(query, hashes)}
+
+    def _encode(self, row: FeedRow) -> tuple[int, bytes] | None:
+        try:
+            if row.error is not None:
+                return 0, pickle.dumps(row.error, pickle.HIGHEST_PROTOCOL)
+            values = row.product.__dict__
+            return 1, pickle.dumps(tuple(values[f] for f in self.fields), pickle.HIGHEST_PROTOCOL)
+        except KeyError:
+            # A LazyProduct with fields still pending validation
+            return None
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Rows holding a value that does not pickle are validated again next run
+            return None
+
+    def _decode(self, line: int, valid: int, data: bytes) -> FeedRow:
+        if valid:
+            return FeedRow(line, self.trusted.from_tuple(pickle.loads(data)), None)
+        return FeedRow(line, None, pickle.loads(data))
+
+    def validate(self, rows: Iterable[tuple[int, dict[str, str]]], prescreen: bool = False) -> Iterator[FeedRow]:
+        # Rows as FeedReader.rows() yields them. Only full validation results are stored, so a cache
+        # serves the same rows with the pre-screen on or off, and pre-screen rejections are not kept
+        model = self.model
+        stats = self.stats
+        generation = self.generation
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            hashes = [row_hash(raw) for _, raw in batch]
+            found = self._lookup(list(set(hashes)))
+            seen: list[tuple[int, bytes]] = []
+            stored: list[tuple[bytes, int, int, bytes]] = []
+            for (line, raw), h in zip(batch, hashes):
+                entry = found.get(h)
+                start = perf_counter()
+                if entry is not None:
+                    row = self._decode(line, *entry)
+                    stats.hit_time += perf_counter() - start
+                    stats.hits += 1
+                    seen.append((generation, h))
+                elif prescreen and (rejection := _prescreen.prescreen(raw)) is not None:
+                    row = FeedRow(line, None, rejection.to_error(model))
+                else:
+                    row = validate_row(model, line, raw)
+                    stats.miss_time += perf_counter() - start
+                    stats.misses += 1
+                    entry = self._encode(row)
+                    if entry is not None:
+                        # A repeat of the row later in the batch is a hit
+                        found[h] = entry
+                        stored.append((h, generation, *entry))
+                yield row
+            self._db.executemany('INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)', stored)
+            self._db.executemany('UPDATE rows SET generation = ? WHERE hash = ?', seen)
+            stats.stored += len(stored)
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM rows').fetchone()[0]
+
+    def evict(self) -> int:
+        cursor = self._db.execute('DELETE FROM rows WHERE generation <= ?', (self.generation - self.max_age,))
+        self.stats.evicted += cursor.rowcount
+        return cursor.rowcount
+
+    def close(self, evict: bool = True):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if evict:
+                self.evict()
+            if self.stats.misses:
+                self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('validate_cost', repr(self.stats.validate_cost)))
+            self._db.commit()
+        finally:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # A run that failed half way has not seen every row, so nothing is evicted
+        self.close(evict=exc_type is None)
@@ -0,0 +1,109 @@
+from enum import Enum, Flag
+from hashlib import blake2b
+from os import PathLike
+from typing import Iterable, Iterator, NamedTuple
+import struct
+
+from ..model.google import Product
+from .writer import FORMATTERS, format_product
+
+class ChangedFields(Flag):
+    NONE = 0
+    PRICE = 1
+    AVAILABILITY = 2
+    OTHER = 4
+
+class ChangeType(Enum):
+    INSERT = 'insert'
+    UPDATE = 'update'
+    DELETE = 'delete'
+
+FIELD_GROUPS: dict[ChangedFields, tuple[str, ...]] = {
+    ChangedFields.PRICE: ('price', 'sale_price', 'sale_price_effective_date', 'cost_of_goods_sold', 'installment', 'subscription_cost'),
+    ChangedFields.AVAILABILITY: ('availability', 'availability_date'),
+}
+FIELD_GROUPS[ChangedFields.OTHER] = tuple(
+    f for f in Product.__fields__
+    if f != 'id' and f not in FIELD_GROUPS[ChangedFields.PRICE] + FIELD_GROUPS[ChangedFields.AVAILABILITY]
+)
+
+DIGEST_SIZE = 8
+FINGERPRINT_SIZE = DIGEST_SIZE * len(FIELD_GROUPS)
+
+# Values are hashed in their feed form, which does not depend on library versions or on which parser
+# built a value. Lists the writer refuses to flatten are joined instead
+_FORMATTERS = {**FORMATTERS, 'gtin': ','.join, 'promotion_id': ','.join}
+_PLANS = [[(f, _FORMATTERS.get(f, str)) for f in fields] for fields in FIELD_GROUPS.values()]
+
+class Change(NamedTuple):
+    type: ChangeType
+    id: str
+    fields: ChangedFields
+    product: Product | None
+
+def _canonical(product: Product, plan: list) -> bytes:
+    # \x01 stands for a missing value, so it differs from an empty one
+    return '\x00'.join('\x01' if v is None else v for v in format_product(product, plan)).encode()
+
+def fingerprint(product: Product) -> bytes:
+    # One digest per field group so an update can tell which group changed
+    return b''.join(blake2b(_canonical(product, plan), digest_size=DIGEST_SIZE).digest() for plan in _PLANS)
+
+def changed_fields(old: bytes, new: bytes) -> ChangedFields:
+    mask = ChangedFields.NONE
+    for i, group in enumerate(FIELD_GROUPS):
+        start = i * DIGEST_SIZE
+        if old[start:start + DIGEST_SIZE] != new[start:start + DIGEST_SIZE]:
+            mask |= group
+    return mask
+
+_MAGIC = b'PFDELTA1'
+_ID_LEN = struct.Struct('<H')
+
+class DeltaState(dict[str, bytes]):
+    def save(self, path: str | PathLike):
+        with open(path, 'wb') as f:
+            f.write(_MAGIC)
+            for id, fp in self.items():
+                encoded = id.encode()
+                f.write(_ID_LEN.pack(len(encoded)))
+                f.write(encoded)
+                f.write(fp)
+
+    @classmethod
+    def load(cls, path: str | PathLike) -> 'DeltaState':
+        state = cls()
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f'{path} is not a delta state file')
+            while header := f.read(_ID_LEN.size):
+                if len(header) != _ID_LEN.size:
+                    raise ValueError(f'{path} is truncated')
+                (n,) = _ID_LEN.unpack(header)
+                id = f.read(n)
+                fp = f.read(FINGERPRINT_SIZE)
+                if len(id) != n or len(fp) != FINGERPRINT_SIZE:
+                    raise ValueError(f'{path} is truncated')
+                state[id.decode()] = fp
+        return state
+
+class DeltaEngine:
+    def __init__(self, previous: DeltaState | None = None):
+        self.previous = previous if previous is not None else DeltaState()
+        self.state = DeltaState()
+
+    def diff(self, products: Iterable[Product]) -> Iterator[Change]:
+        previous = self.previous
+        state = self.state = DeltaState()
+        for product in products:
+            fp = fingerprint(product)
+            state[product.id] = fp
+            old = previous.get(product.id)
+            if old is None:
+                yield Change(ChangeType.INSERT, product.id, ChangedFields.PRICE | ChangedFields.AVAILABILITY | ChangedFields.OTHER, product)
+            elif old != fp:
+                yield Change(ChangeType.UPDATE, product.id, changed_fields(old, fp), product)
+
+        for id in previous:
+            if id not in state:
+                yield Change(ChangeType.DELETE, id, ChangedFields.NONE, None)
@@ -0,0 +1,65 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+from typing import Iterable, Iterator
+import os
+
+from pydantic import BaseModel
+
+from ..model.google import Product
+from .batch import validate_batch
+from .reader import FeedRow, validate_row
+
+def _validate_chunk(model: type[BaseModel], chunk: list[tuple[int, dict[str, str]]], batch: bool) -> list[FeedRow]:
+    if batch:
+        return validate_batch(chunk, model)
+    return [validate_row(model, line, raw) for line, raw in chunk]
+
+class ValidationStats:
+    def __init__(self):
+        self.rows = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return f'ValidationStats(rows={self.rows}, errors={self.errors}, elapsed={self.elapsed:.3f}, rows_per_second={self.rows_per_second:.1f})'
+
+class ParallelValidator:
+    def __init__(self, workers: int | None = None, chunk_size: int = 1000, model: type[BaseModel] = Product, batch: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.model = model
+        self.batch = batch
+        self.stats = ValidationStats()
+
+    def validate(self, rows: Iterable[tuple[int, dict[str, str]]]) -> Iterator[FeedRow]:
+        stats = self.stats = ValidationStats()
+        start = perf_counter()
+        rows = iter(rows)
+        # Only a couple of chunks per worker are in flight at once, so memory stays bounded
+        # and results can be handed back in input order
+        pending: deque[Future] = deque()
+        pool = ProcessPoolExecutor(self.workers)
+        try:
+            while True:
+                while len(pending) < self.workers * 2:
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_validate_chunk, self.model, chunk, self.batch))
+                if not pending:
+                    break
+                for row in pending.popleft().result():
+                    stats.rows += 1
+                    if row.error is not None:
+                        stats.errors += 1
+                    yield row
+                stats.elapsed = perf_counter() - start
+        finally:
+            pool.shutdown(cancel_futures=True)
+            stats.elapsed = perf_counter() - start
@@ -0,0 +1,179 @@
+from concurrent.futures import Executor
+from itertools import islice
+from time import perf_counter
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+import asyncio
+
+from pydantic import BaseModel
+
+from ..model.google import Product
+from .reader import FeedRow, validate_row
+
+T = TypeVar('T')
+
+Source = AsyncIterable[tuple[int, dict[str, str]]]
+Sink = Callable[[FeedRow], Awaitable[None]]
+
+_DONE = object()
+
+async def iterate_in_executor(iterable: Iterable[T], chunk_size: int = 1000, executor: Executor | None = None) -> AsyncIterator[T]:
+    # Pulls blocking iterators such as FeedReader.rows() in chunks off the event loop
+    loop = asyncio.get_running_loop()
+    it = iter(iterable)
+    while chunk := await loop.run_in_executor(executor, lambda: list(islice(it, chunk_size))):
+        for item in chunk:
+            yield item
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency: float):
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return f'StageStats({self.name!r}, count={self.count}, mean={self.mean * 1e3:.3f}ms, max={self.max * 1e3:.3f}ms)'
+
+class BoundedQueue(asyncio.Queue):
+    def __init__(self, name: str, maxsize: int):
+        super().__init__(maxsize)
+        self.name = name
+        self.max_depth = 0
+
+    async def put(self, item):
+        await super().put(item)
+        depth = self.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+class Pipeline:
+    """source -> bounded queue -> validation (in an executor) -> bounded queue per sink -> sink.
+
+    Every queue is bounded, so a slow sink blocks validation, which in turn blocks reading.
+    Pass a ProcessPoolExecutor to spread validation across cores.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[Source],
+        sinks: dict[str, Sink],
+        validation_workers: int = 4,
+        sink_workers: int = 1,
+        queue_size: int = 1000,
+        executor: Executor | None = None,
+        model: type[BaseModel] = Product,
+    ):
+        self.sources = list(sources)
+        self.sinks = sinks
+        self.validation_workers = validation_workers
+        self.sink_workers = sink_workers
+        self.queue_size = queue_size
+        self.executor = executor
+        self.model = model
+
+        self.stages = {'read': StageStats('read'), 'validate': StageStats('validate')}
+        self.stages.update({f'sink:{name}': StageStats(f'sink:{name}') for name in sinks})
+        self.queues: dict[str, BoundedQueue] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._runner: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+    def queue_depths(self) -> dict[str, int]:
+        return {name: q.qsize() for name, q in self.queues.items()}
+
+    def max_queue_depths(self) -> dict[str, int]:
+        return {name: q.max_depth for name, q in self.queues.items()}
+
+    async def _read(self, source: Source, out: BoundedQueue):
+        stats = self.stages['read']
+        it = source.__aiter__()
+        while True:
+            start = perf_counter()
+            try:
+                item = await it.__anext__()
+            except StopAsyncIteration:
+                return
+            stats.record(perf_counter() - start)
+            await out.put(item)
+
+    async def _validate(self, inp: BoundedQueue, outs: list[BoundedQueue]):
+        stats = self.stages['validate']
+        loop = asyncio.get_running_loop()
+        while (item := await inp.get()) is not _DONE:
+            line, raw = item
+            start = perf_counter()
+            row = await loop.run_in_executor(self.executor, validate_row, self.model, line, raw)
+            stats.record(perf_counter() - start)
+            for out in outs:
+                await out.put(row)
+
+    async def _sink(self, name: str, sink: Sink, inp: BoundedQueue):
+        stats = self.stages[f'sink:{name}']
+        while (row := await inp.get()) is not _DONE:
+            start = perf_counter()
+            await sink(row)
+            stats.record(perf_counter() - start)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        task.add_done_callback(self._on_done)
+        self._tasks.append(task)
+        return task
+
+    def _on_done(self, task: asyncio.Task):
+        if task.cancelled() or task.exception() is None or self._error is not None:
+            return
+        # First failure wins, everything else is torn down so no stage stays blocked on a full queue.
+        # run() itself may be parked putting a sentinel on a queue nothing drains any more
+        self._error = task.exception()
+        for t in self._tasks:
+            t.cancel()
+        if self._runner is not None:
+            self._runner.cancel()
+
+    async def run(self) -> dict[str, StageStats]:
+        self._runner = asyncio.current_task()
+        raw = self.queues['raw'] = BoundedQueue('raw', self.queue_size)
+        outs = []
+        for name in self.sinks:
+            outs.append(BoundedQueue(f'sink:{name}', self.queue_size))
+            self.queues[f'sink:{name}'] = outs[-1]
+
+        readers = [self._spawn(self._read(source, raw)) for source in self.sources]
+        validators = [self._spawn(self._validate(raw, outs)) for _ in range(self.validation_workers)]
+        sinks = [
+            self._spawn(self._sink(name, sink, out))
+            for (name, sink), out in zip(self.sinks.items(), outs)
+            for _ in range(self.sink_workers)
+        ]
+
+        try:
+            await asyncio.gather(*readers)
+            for _ in validators:
+                await raw.put(_DONE)
+            await asyncio.gather(*validators)
+            for out in outs:
+                for _ in range(self.sink_workers):
+                    await out.put(_DONE)
+            await asyncio.gather(*sinks)
+        except asyncio.CancelledError:
+            if self._error is not None:
+                raise self._error from None
+            raise
+        finally:
+            self._runner = None
+            for t in self._tasks:
+                t.cancel()
+        if self._error is not None:
+            raise self._error
+        return self.stages
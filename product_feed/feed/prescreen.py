@@ -0,0 +1,91 @@
+from enum import Enum
+from typing import NamedTuple
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_SINGLETON
+
+from ..model.google import GTIN_LENGTHS, MAX_LENGTH, Product, gtin_check_digit
+from ..model.parsing import parse_amount
+
+REQUIRED_FIELDS = tuple(name for name, field in Product.__fields__.items() if field.required)
+
+# Fields with a pre validator, such as unit_pricing_measure, normalise the value before the enum sees it
+ENUM_VALUES: dict[str, frozenset[str]] = {
+    name: frozenset(e.value for e in field.type_)
+    for name, field in Product.__fields__.items()
+    if field.shape == SHAPE_SINGLETON and isinstance(field.type_, type) and issubclass(field.type_, Enum)
+    and not field.pre_validators
+}
+
+AMOUNT_FIELDS = ('price', 'sale_price', 'cost_of_goods_sold')
+URL_FIELDS = ('link', 'image_link', 'mobile_link', 'ads_redirect')
+
+class Rejection(NamedTuple):
+    field: str
+    reason: str
+
+    def wrapper(self) -> ErrorWrapper:
+        return ErrorWrapper(AssertionError(self.reason), loc=self.field)
+
+    def to_error(self, model: type[BaseModel] = Product) -> ValidationError:
+        return ValidationError([self.wrapper()], model)
+
+# Shared with the batch validator, so a rule rejects with the same reason whichever checked it
+def missing(field: str) -> Rejection:
+    return Rejection(field, f'{field} is required')
+
+def too_long(field: str) -> Rejection:
+    return Rejection(field, f'{field} must be less than {MAX_LENGTH[field]} characters')
+
+def not_allowed(field: str) -> Rejection:
+    return Rejection(field, f'{field} must be one of: {", ".join(sorted(ENUM_VALUES[field]))}')
+
+def gtin_digits(value: str) -> str:
+    # Product.gtin_format drops everything but the digits
+    return value if value.isdigit() else ''.join(c for c in value if c.isdigit())
+
+def bad_gtin(digits: str) -> Rejection:
+    if len(digits) not in GTIN_LENGTHS:
+        return Rejection('gtin', 'gtin must be 8, 12, 13, or 14 digits')
+    return Rejection('gtin', 'gtin has an invalid check digit')
+
+def prescreen(raw: dict[str, str]) -> Rejection | None:
+    # Only checks that the Product validators are guaranteed to fail on, so no valid row is rejected
+    for field in REQUIRED_FIELDS:
+        if raw.get(field) is None:
+            return missing(field)
+
+    for field, value in raw.items():
+        limit = MAX_LENGTH.get(field)
+        if limit is not None and len(value) > limit:
+            return too_long(field)
+
+    for field in AMOUNT_FIELDS:
+        value = raw.get(field)
+        if value:
+            try:
+                amount = parse_amount(value)
+            except ValueError as e:
+                return Rejection(field, str(e))
+            if amount is None:
+                return Rejection(field, f'{field} must be in the format "0.00 USD"')
+
+    for field, values in ENUM_VALUES.items():
+        value = raw.get(field)
+        if value and value not in values:
+            return not_allowed(field)
+
+    value = raw.get('gtin')
+    if value:
+        digits = gtin_digits(value)
+        if len(digits) not in GTIN_LENGTHS or not gtin_check_digit(digits):
+            return bad_gtin(digits)
+
+    for field in URL_FIELDS:
+        value = raw.get(field)
+        # pydantic strips surrounding whitespace off a URL before checking its scheme
+        if value and not value.lstrip()[:8].lower().startswith(('http://', 'https://')):
+            return Rejection(field, f'{field} must be an http or https URL')
+
+    return None
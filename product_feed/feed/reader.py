@@ -0,0 +1,110 @@
+from itertools import chain
+from os import PathLike
+from typing import IO, TYPE_CHECKING, Iterator, NamedTuple
+import csv
+
+from pydantic import BaseModel, ValidationError
+
+from ..model.google import Product
+from .prescreen import prescreen
+from .source import DEFAULT_CHUNK_SIZE, FeedSource
+
+if TYPE_CHECKING:
+    from .cache import ValidationCache
+
+# Merchant Center spellings that do not match the attribute name on the model
+HEADER_ALIASES = {
+    'product_highlight': 'product_hightlight',
+}
+
+class FeedRow(NamedTuple):
+    line: int
+    product: BaseModel | None
+    error: ValidationError | None
+
+def normalize_header(name: str) -> str:
+    name = name.strip().lower()
+    if name.startswith('g:'):
+        name = name[2:]
+    name = name.replace(' ', '_')
+    return HEADER_ALIASES.get(name, name)
+
+def compile_header(header: list[str], model: type[BaseModel] = Product) -> list[tuple[int, str]]:
+    fields = model.__fields__
+    mapping = []
+    for i, name in enumerate(header):
+        name = normalize_header(name)
+        if name in fields:
+            mapping.append((i, name))
+    return mapping
+
+def validate_row(model: type[BaseModel], line: int, raw: dict[str, str]) -> FeedRow:
+    try:
+        return FeedRow(line, model(**raw), None)
+    except ValidationError as e:
+        return FeedRow(line, None, e)
+
+class FeedReader:
+    def __init__(
+        self,
+        source: str | PathLike | FeedSource | IO[str],
+        delimiter: str | None = None,
+        model: type[BaseModel] = Product,
+        prescreen: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache: 'ValidationCache | None' = None,
+    ):
+        # Files are opened through FeedSource, so gzip, bz2 and xz feeds are read as they are
+        if isinstance(source, (str, PathLike)):
+            source = FeedSource(source, chunk_size)
+        self.source = source
+        self.delimiter = delimiter
+        self.model = model
+        self.prescreen = prescreen
+        # Rows already in the cache are decoded from it instead of validated
+        if cache is not None and cache.model is not model:
+            raise ValueError(f'cache holds {cache.model.__name__} rows, not {model.__name__}')
+        self.cache = cache
+
+    def _open(self) -> IO[str]:
+        if isinstance(self.source, FeedSource):
+            return self.source.open()
+        return self.source
+
+    def _delimiter(self, header_line: str) -> str:
+        if self.delimiter:
+            return self.delimiter
+        return '\t' if '\t' in header_line else ','
+
+    def rows(self, keep_empty: bool = False) -> Iterator[tuple[int, dict[str, str]]]:
+        f = self._open()
+        try:
+            header_line = next(f, None)
+            if header_line is None:
+                return
+            reader = csv.reader(chain([header_line], f), delimiter=self._delimiter(header_line))
+            mapping = compile_header(next(reader), self.model)
+            for row in reader:
+                if not row:
+                    continue
+                n = len(row)
+                if keep_empty:
+                    yield reader.line_num, {name: row[i] for i, name in mapping if i < n}
+                    continue
+                # Empty cells are treated as missing so optional fields stay None
+                yield reader.line_num, {name: row[i] for i, name in mapping if i < n and row[i] != ''}
+        finally:
+            if f is not self.source:
+                f.close()
+
+    def _validate(self, line: int, raw: dict[str, str]) -> FeedRow:
+        if self.prescreen and (rejection := prescreen(raw)) is not None:
+            return FeedRow(line, None, rejection.to_error(self.model))
+        return validate_row(self.model, line, raw)
+
+    def __iter__(self) -> Iterator[FeedRow]:
+        if self.cache is not None:
+            yield from self.cache.validate(self.rows(), self.prescreen)
+            return
+        for line, raw in self.rows():
+            yield self._validate(line, raw)
@@ -0,0 +1,150 @@
+"""Feed export split into size-capped, gzip compressed shards.
+
+Rows are rendered on the calling thread and each finished shard is compressed and
+written by a thread pool. zlib releases the GIL while compressing, so shards are
+compressed on as many cores as there are workers. At most `workers + 1` shards are
+held in memory at once, about `(workers + 1) * max_bytes` of uncompressed output.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import PathLike
+from typing import Any, Iterable, NamedTuple
+import io
+import json
+import os
+import zlib
+
+from ..model.google import Product
+from .writer import FeedWriter, TsvWriter
+
+# Merchant Center rejects feed files over 4 GB, shards stay well below to keep memory bounded
+DEFAULT_MAX_BYTES = 64 << 20
+
+class Shard(NamedTuple):
+    file: str
+    rows: int
+    bytes: int
+    compressed_bytes: int
+
+_SLICE = 1 << 20
+
+def _compress(path: str, chunks: list[bytes], level: int) -> int:
+    # One gzip member per shard, fed in large slices so zlib spends its time with the GIL released
+    data = memoryview(b''.join(chunks))
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    with open(path, 'wb') as f:
+        for start in range(0, len(data), _SLICE):
+            f.write(compressor.compress(data[start:start + _SLICE]))
+        f.write(compressor.flush())
+        return f.tell()
+
+class ShardedWriter:
+    def __init__(
+        self,
+        directory: str | PathLike,
+        prefix: str = 'feed',
+        format: type[FeedWriter] = TsvWriter,
+        max_rows: int | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        workers: int | None = None,
+        level: int = 6,
+        **kwargs: Any,
+    ):
+        # kwargs go to the format, e.g. fields, or title and link for RssWriter
+        self.directory = os.fspath(directory)
+        self.prefix = prefix
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.workers = workers or os.cpu_count() or 1
+        self.level = level
+        self.renderer = format(io.StringIO(), **kwargs)
+        self.shards: list[Shard] = []
+        self.rows = 0
+
+        self._header = self.renderer.header().encode()
+        self._footer = self.renderer.footer().encode()
+        self._chunks: list[bytes] = []
+        self._shard_rows = 0
+        self._shard_bytes = 0
+        self._pending: deque[tuple[str, int, int, Future]] = deque()
+        self._pool: ThreadPoolExecutor | None = None
+        self._closed = False
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.directory, f'{self.prefix}-{index:05d}{self.renderer.extension}.gz')
+
+    def _collect(self):
+        path, rows, size, future = self._pending.popleft()
+        self.shards.append(Shard(os.path.basename(path), rows, size, future.result()))
+
+    def _cut(self):
+        if not self._shard_rows:
+            return
+        if self._pool is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._pool = ThreadPoolExecutor(self.workers)
+        self._chunks.append(self._footer)
+        path = self._path(len(self.shards) + len(self._pending))
+        future = self._pool.submit(_compress, path, self._chunks, self.level)
+        self._pending.append((path, self._shard_rows, self._shard_bytes + len(self._footer), future))
+        self._chunks = []
+        self._shard_rows = 0
+        self._shard_bytes = 0
+        while len(self._pending) > self.workers:
+            self._collect()
+
+    def write(self, product: Product):
+        row = self.renderer.render(product).encode()
+        if self._shard_rows and (
+            (self.max_rows is not None and self._shard_rows >= self.max_rows)
+            or self._shard_bytes + len(row) + len(self._footer) > self.max_bytes
+        ):
+            self._cut()
+        if not self._shard_rows:
+            self._chunks.append(self._header)
+            self._shard_bytes = len(self._header)
+        self._chunks.append(row)
+        self._shard_bytes += len(row)
+        self._shard_rows += 1
+        self.rows += 1
+
+    def write_all(self, products: Iterable[Product]):
+        for product in products:
+            self.write(product)
+
+    def manifest(self) -> dict[str, Any]:
+        return {
+            'format': type(self.renderer).__name__,
+            'fields': self.renderer.fields,
+            'rows': sum(s.rows for s in self.shards),
+            'shards': [s._asdict() for s in self.shards],
+        }
+
+    def close(self) -> dict[str, Any]:
+        if self._closed:
+            return self.manifest()
+        self._closed = True
+        try:
+            self._cut()
+            while self._pending:
+                self._collect()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self.manifest()
+        with open(os.path.join(self.directory, f'{self.prefix}-manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        elif self._pool is not None:
+            # Leave no manifest behind for an export that failed half way
+            self._closed = True
+            self._pool.shutdown(cancel_futures=True)
@@ -0,0 +1,106 @@
+from os import PathLike
+from time import perf_counter
+from typing import IO, Callable
+import bz2
+import gzip
+import io
+import lzma
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Codecs by the magic bytes their streams start with
+CODECS: dict[str, tuple[bytes, Callable[[IO[bytes]], IO[bytes]]]] = {
+    'gzip': (b'\x1f\x8b', lambda f: gzip.GzipFile(fileobj=f, mode='rb')),
+    'bz2': (b'BZh', lambda f: bz2.BZ2File(f, mode='rb')),
+    'xz': (b'\xfd7zXZ\x00', lambda f: lzma.LZMAFile(f, mode='rb')),
+}
+
+def detect_codec(head: bytes) -> str | None:
+    for name, (magic, _) in CODECS.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+class SourceStats:
+    def __init__(self):
+        self.codec: str | None = None
+        self.compressed_bytes = 0
+        self.bytes = 0
+        # Time spent reading and decompressing, not in whatever consumes the rows
+        self.elapsed = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def compressed_bytes_per_second(self) -> float:
+        return self.compressed_bytes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    def __repr__(self):
+        return (
+            f'SourceStats(codec={self.codec}, compressed_bytes={self.compressed_bytes}, bytes={self.bytes}, '
+            f'ratio={self.ratio:.2f}, bytes_per_second={self.bytes_per_second:.0f})'
+        )
+
+class _Counting(io.RawIOBase):
+    def __init__(self, f: IO[bytes], count: Callable[[int, float], None], owned: tuple[IO[bytes], ...] = ()):
+        self._f = f
+        self._count = count
+        # Streams opened on the caller's behalf, closed along with this one
+        self._owned = owned
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        start = perf_counter()
+        n = self._f.readinto(b)
+        self._count(n or 0, perf_counter() - start)
+        return n
+
+    def close(self):
+        if not self.closed:
+            for f in self._owned:
+                f.close()
+        super().close()
+
+class FeedSource:
+    """A feed file or binary stream, decompressed on the fly when it is gzip, bz2 or xz.
+
+    Both the compressed and the decompressed side are read `chunk_size` bytes at
+    a time, so neither the codec nor the CSV reader is fed in small pieces.
+    """
+
+    def __init__(self, source: str | PathLike | IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = 'utf-8-sig'):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.stats = SourceStats()
+
+    def _count_compressed(self, n: int, elapsed: float):
+        self.stats.compressed_bytes += n
+
+    def _count(self, n: int, elapsed: float):
+        self.stats.bytes += n
+        self.stats.elapsed += elapsed
+
+    def open_binary(self) -> IO[bytes]:
+        stats = self.stats = SourceStats()
+        if isinstance(self.source, (str, PathLike)):
+            f = open(self.source, 'rb', buffering=0)
+            raw = io.BufferedReader(_Counting(f, self._count_compressed, (f,)), self.chunk_size)
+        else:
+            raw = io.BufferedReader(_Counting(self.source, self._count_compressed), self.chunk_size)
+        stats.codec = detect_codec(raw.peek(8)[:8])
+        if stats.codec is None:
+            return io.BufferedReader(_Counting(raw, self._count, (raw,)), self.chunk_size)
+        stream = CODECS[stats.codec][1](raw)
+        return io.BufferedReader(_Counting(stream, self._count, (stream, raw)), self.chunk_size)
+
+    def open(self) -> IO[str]:
+        return io.TextIOWrapper(self.open_binary(), encoding=self.encoding, newline='')
@@ -0,0 +1,93 @@
+from time import perf_counter
+from typing import Any, Iterable, Iterator
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+from ..model.catalog import Catalog
+from ..model.google import Product
+from .reader import FeedRow
+
+# What merchants usually send in an intraday supplemental feed
+SUPPLEMENTAL_FIELDS = ('price', 'sale_price', 'availability')
+
+class SupplementalStats:
+    def __init__(self):
+        self.rows = 0
+        self.updated = 0
+        self.unknown = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return (
+            f'SupplementalStats(rows={self.rows}, updated={self.updated}, unknown={self.unknown}, '
+            f'errors={self.errors}, elapsed={self.elapsed:.3f})'
+        )
+
+class SupplementalMerger:
+    """Applies partial rows keyed by id to the products of a catalog.
+
+    Only the supplied fields are validated, with the same field validators
+    Product uses, so a row costs the same whatever the size of the catalog.
+    An empty cell clears an optional field such as `sale_price`, so rows should
+    come from `FeedReader.rows(keep_empty=True)`, which keeps those cells.
+    """
+
+    def __init__(self, catalog: Catalog, model: type[BaseModel] = Product, fields: Iterable[str] = SUPPLEMENTAL_FIELDS):
+        self.catalog = catalog
+        self.model = model
+        self.fields = {f: model.__fields__[f] for f in fields}
+        self.stats = SupplementalStats()
+
+    def validate(self, raw: dict[str, str]) -> dict[str, Any]:
+        values: dict[str, Any] = {}
+        errors: list[ErrorWrapper] = []
+        for name, value in raw.items():
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            if value == '':
+                if field.required:
+                    errors.append(ErrorWrapper(AssertionError(f'{name} cannot be cleared'), loc=name))
+                else:
+                    values[name] = None
+                continue
+            v, error = field.validate(value, values, loc=name, cls=self.model)
+            if error:
+                errors.append(error)
+            else:
+                values[name] = v
+        if errors:
+            raise ValidationError(errors, self.model)
+        return values
+
+    def _apply(self, line: int, raw: dict[str, str]) -> FeedRow:
+        id = raw.get('id')
+        if not id:
+            return FeedRow(line, None, ValidationError([ErrorWrapper(AssertionError('id is required'), loc='id')], self.model))
+        if id not in self.catalog:
+            self.stats.unknown += 1
+            error = AssertionError(f'id {id!r} is not in the catalog')
+            return FeedRow(line, None, ValidationError([ErrorWrapper(error, loc='id')], self.model))
+        try:
+            values = self.validate(raw)
+        except ValidationError as e:
+            return FeedRow(line, None, e)
+        product = self.catalog.update(id, values)
+        self.stats.updated += 1
+        return FeedRow(line, product, None)
+
+    def apply(self, rows: Iterable[tuple[int, dict[str, str]]]) -> Iterator[FeedRow]:
+        # Rows as FeedReader.rows(keep_empty=True) yields them. A rejected row leaves its product untouched
+        stats = self.stats = SupplementalStats()
+        start = perf_counter()
+        try:
+            for line, raw in rows:
+                row = self._apply(line, raw)
+                stats.rows += 1
+                if row.error is not None:
+                    stats.errors += 1
+                yield row
+        finally:
+            stats.elapsed = perf_counter() - start
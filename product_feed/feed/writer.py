@@ -0,0 +1,233 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import Enum
+from os import PathLike
+from typing import IO, Any, Callable, Iterable, Sequence
+from xml.sax.saxutils import escape
+
+from ..model.google import Amount, Product, Shipping
+from .reader import HEADER_ALIASES
+
+# Attribute names as Merchant Center spells them, where they differ from the model
+ATTRIBUTE_NAMES = {v: k for k, v in HEADER_ALIASES.items()}
+
+def format_amount(v: Amount) -> str:
+    return f'{v[0]} {v[1].code}'
+
+def format_datetime(v: datetime) -> str:
+    if v.microsecond:
+        s = v.strftime('%Y-%m-%dT%H:%M:%S.%f').rstrip('0')
+    else:
+        s = v.strftime('%Y-%m-%dT%H:%M:%S' if v.second else '%Y-%m-%dT%H:%M')
+    return s + v.strftime('%z')
+
+def format_bool(v: bool) -> str:
+    return 'yes' if v else 'no'
+
+def format_enum(v: Enum) -> str:
+    return v.value
+
+def format_measure(v: tuple[str, Enum]) -> str:
+    return f'{v[0]} {v[1].value}'
+
+def _join(sep: str, format: Callable[[Any], str] = str) -> Callable[[list], str]:
+    return lambda v: sep.join(map(format, v))
+
+def _single(field: str) -> Callable[[list[str]], str]:
+    # The validator keeps the feed value whole as the only item, so a longer list has no feed form
+    def format(v: list[str]) -> str:
+        if len(v) != 1:
+            raise ValueError(f'{field} holds {len(v)} values, a feed row carries one')
+        return v[0]
+    return format
+
+def _shipping(s: Shipping) -> str:
+    # Without a price the segment is left out, an empty one is not a valid amount
+    value = f'{s.country.alpha2}:{s.region or ""}:{s.service or ""}'
+    return value if s.price is None else f'{value}:{format_amount(s.price)}'
+
+def _tax_ship(v: bool | None) -> str:
+    return '' if v is None else format_bool(v)
+
+FORMATTERS: dict[str, Callable[[Any], str]] = {
+    'additional_image_link': _join(','),
+    'availability': format_enum,
+    'availability_date': format_datetime,
+    'cost_of_goods_sold': format_amount,
+    'expiration_date': format_datetime,
+    'price': format_amount,
+    'sale_price': format_amount,
+    'sale_price_effective_date': lambda v: f'{format_datetime(v[0])}/{format_datetime(v[1])}',
+    'unit_pricing_measure': format_enum,
+    'unit_pricing_base_measure': lambda v: f'{v[0]}{v[1].value}',
+    'installment': lambda v: f'{v.months}:{format_amount(v.amount)}',
+    'subscription_cost': lambda v: f'{v.period.value}:{v.period_length}:{format_amount(v.amount)}',
+    'loyalty_points': lambda v: f'{v.name or ""}:{v.points_value}:{v.ratio}',
+    'product_type': _join(','),
+    'gtin': _single('gtin'),
+    'identifier_exists': format_bool,
+    'condition': format_enum,
+    'adult': format_bool,
+    'is_bundle': format_bool,
+    'energy_efficiency_class': format_enum,
+    'min_energy_efficiency_class': format_enum,
+    'max_energy_efficiency_class': format_enum,
+    'age_group': format_enum,
+    'color': _join('/'),
+    'gender': format_enum,
+    'size_type': _join(',', format_enum),
+    'size_system': format_enum,
+    'product_length': format_measure,
+    'product_width': format_measure,
+    'product_height': format_measure,
+    'product_weight': format_measure,
+    'product_detail': _join(',', lambda d: f'{d.section_name or ""}:{d.attribute_name}:{d.attribute_value}'),
+    'product_hightlight': _join(','),
+    'promotion_id': _single('promotion_id'),
+    'excluded_destination': _join(',', format_enum),
+    'included_destination': _join(',', format_enum),
+    'shopping_ads_excluded_country': _join(',', lambda c: c.alpha2),
+    'pause': format_enum,
+    'shipping': _join(',', _shipping),
+    'shipping_weight': format_measure,
+    'shipping_length': format_measure,
+    'shipping_width': format_measure,
+    'shipping_height': format_measure,
+    'ships_from_country': lambda c: c.alpha2,
+    'tax': _join(',', lambda t: f'{t.country or ""}:{t.region or ""}:{t.rate}:{_tax_ship(t.tax_ship)}'),
+}
+
+def compile_plan(fields: Sequence[str]) -> list[tuple[str, Callable[[Any], str]]]:
+    return [(f, FORMATTERS.get(f, str)) for f in fields]
+
+def format_product(product: Product, plan: list[tuple[str, Callable[[Any], str]]]) -> list[str | None]:
+    values = []
+    for field, format in plan:
+        v = getattr(product, field)
+        values.append(None if v is None else format(v))
+    return values
+
+class FeedWriter(ABC):
+    extension = ''
+
+    def __init__(self, target: str | PathLike | IO[str], fields: Sequence[str] | None = None, buffer_size: int = 1 << 20):
+        self.target = target
+        self.fields = list(fields or Product.__fields__)
+        self.plan = compile_plan(self.fields)
+        self.buffer_size = buffer_size
+        self.rows = 0
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._file: IO[str] | None = None
+        self._closed = False
+
+    def _open(self) -> IO[str]:
+        if isinstance(self.target, (str, PathLike)):
+            return open(self.target, 'w', newline='', encoding='utf-8')
+        return self.target
+
+    def _emit(self, s: str):
+        self._buffer.append(s)
+        self._buffered += len(s)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def header(self) -> str:
+        return ''
+
+    def footer(self) -> str:
+        return ''
+
+    @abstractmethod
+    def _render(self, values: list[str | None]) -> str:
+        ...
+
+    def render(self, product: Product) -> str:
+        return self._render(format_product(product, self.plan))
+
+    def write(self, product: Product):
+        if self._file is None:
+            self._file = self._open()
+            self._emit(self.header())
+        self._emit(self.render(product))
+        self.rows += 1
+
+    def write_all(self, products: Iterable[Product]):
+        for product in products:
+            self.write(product)
+
+    def flush(self):
+        if self._buffer and self._file is not None:
+            self._file.write(''.join(self._buffer))
+        self._buffer.clear()
+        self._buffered = 0
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._file is None:
+            self._file = self._open()
+            self._emit(self.header())
+        self._emit(self.footer())
+        self.flush()
+        if self._file is not self.target:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_TSV_ESCAPE = str.maketrans({'\t': ' ', '\n': ' ', '\r': ' '})
+
+def _tsv_value(v: str | None) -> str:
+    if v is None:
+        return ''
+    # Tabs and line breaks are not printable, so clean values skip the slow translate
+    if not v.isprintable():
+        v = v.translate(_TSV_ESCAPE)
+    # FeedReader reads with csv's default quoting, where a value starting with a quote is quoted
+    if v.startswith('"'):
+        v = '"' + v.replace('"', '""') + '"'
+    return v
+
+class TsvWriter(FeedWriter):
+    extension = '.tsv'
+
+    def header(self) -> str:
+        return '\t'.join(ATTRIBUTE_NAMES.get(f, f) for f in self.fields) + '\n'
+
+    def _render(self, values: list[str | None]) -> str:
+        return '\t'.join(map(_tsv_value, values)) + '\n'
+
+class RssWriter(FeedWriter):
+    extension = '.xml'
+
+    def __init__(self, target: str | PathLike | IO[str], title: str, link: str, description: str = '', **kwargs):
+        super().__init__(target, **kwargs)
+        self.channel = (title, link, description)
+        self._tags = [ATTRIBUTE_NAMES.get(f, f) for f in self.fields]
+
+    def header(self) -> str:
+        title, link, description = map(escape, self.channel)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0">\n'
+            '<channel>\n'
+            f'<title>{title}</title>\n<link>{link}</link>\n<description>{description}</description>\n'
+        )
+
+    def footer(self) -> str:
+        return '</channel>\n</rss>\n'
+
+    def _render(self, values: list[str | None]) -> str:
+        parts = ['<item>']
+        for tag, v in zip(self._tags, values):
+            if v is not None:
+                parts.append(f'<g:{tag}>{escape(v)}</g:{tag}>')
+        parts.append('</item>\n')
+        return ''.join(parts)
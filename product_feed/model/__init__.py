@@ -1 +1,23 @@
-from .google import Product as GoogleProduct
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .google import Product as GoogleProduct
+    from .catalog import Catalog, CompactCatalog
+
+# Submodules are imported on first attribute access, so importing one of them does not build the others
+_EXPORTS = {
+    'GoogleProduct': ('.google', 'Product'),
+    'Catalog': ('.catalog', 'Catalog'),
+    'CompactCatalog': ('.catalog', 'CompactCatalog'),
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    try:
+        module, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = globals()[name] = getattr(import_module(module, __name__), attr)
+    return value
@@ -0,0 +1,145 @@
+from copy import copy
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import TYPE_CHECKING, Any, Iterable, Mapping
+
+from pydantic import BaseModel
+
+from .catalog import Catalog
+from .google import Amount, Product
+
+if TYPE_CHECKING:
+    from iso4217 import Currency
+
+AMOUNT_FIELDS = ('price', 'sale_price', 'cost_of_goods_sold')
+# Nested models holding an amount, by the product field they sit in and their own amount field
+NESTED_AMOUNT_FIELDS = {
+    'installment': 'amount',
+    'subscription_cost': 'amount',
+    'shipping': 'price',
+}
+
+def _replace(model: BaseModel, update: dict[str, Any]) -> BaseModel:
+    # copy(update=...) walks every field through _iter, this only swaps the updated values
+    new = object.__new__(type(model))
+    object.__setattr__(new, '__dict__', {**model.__dict__, **update})
+    object.__setattr__(new, '__fields_set__', model.__fields_set__ | update.keys())
+    for name in model.__private_attributes__:
+        # Shallow copies, so e.g. a LazyProduct validating a deferred field does not affect its original
+        object.__setattr__(new, name, copy(getattr(model, name, None)))
+    return new
+
+class ConversionStats:
+    def __init__(self):
+        self.products = 0
+        self.amounts = 0
+        self.distinct = 0
+        self.currencies = 0
+
+    def __repr__(self):
+        return (
+            f'ConversionStats(products={self.products}, amounts={self.amounts}, '
+            f'distinct={self.distinct}, currencies={self.currencies})'
+        )
+
+class CurrencyConverter:
+    """Converts every amount of a set of products into one currency.
+
+    `rates` maps each source currency to the units of `target` one unit of it is
+    worth. Amounts already in `target` are left as they are. The same amount
+    repeats across a catalog, so each distinct (Decimal, Currency) tuple is
+    converted once, and then a currency at a time with its rate and the target's
+    quantum, so the result is rounded to the target's minor unit.
+    """
+
+    def __init__(self, rates: Mapping['Currency', Decimal | str | int], target: 'Currency', rounding: str = ROUND_HALF_EVEN):
+        self.rates = {currency: Decimal(str(rate)) for currency, rate in rates.items()}
+        self.target = target
+        self.rounding = rounding
+        # Currencies without minor units defined in ISO 4217, such as XAU, are not rounded
+        self.quantum = None if target.exponent is None else Decimal(1).scaleb(-target.exponent)
+        self.stats = ConversionStats()
+        self._converted: dict[Amount, Amount] = {}
+        self._nested: dict[int, tuple[BaseModel, BaseModel]] = {}
+
+    def convert_amounts(self, amounts: Iterable[Amount]) -> dict[Amount, Amount]:
+        groups: dict['Currency', set[Decimal]] = {}
+        for amount in amounts:
+            if amount not in self._converted:
+                groups.setdefault(amount[1], set()).add(amount[0])
+
+        for currency, values in groups.items():
+            if currency is self.target:
+                self._converted.update(((v, currency), (v, currency)) for v in values)
+                continue
+            rate = self.rates.get(currency)
+            if rate is None:
+                raise ValueError(f'no {currency.code} to {self.target.code} rate')
+            target, quantum, rounding = self.target, self.quantum, self.rounding
+            if quantum is None:
+                self._converted.update(((v, currency), (v * rate, target)) for v in values)
+            else:
+                self._converted.update(((v, currency), ((v * rate).quantize(quantum, rounding), target)) for v in values)
+            self.stats.currencies += 1
+        return self._converted
+
+    def _amounts(self, products: list[Product]) -> Iterable[Amount]:
+        for product in products:
+            values = product.__dict__
+            for field in AMOUNT_FIELDS:
+                if values[field] is not None:
+                    yield values[field]
+            for field, amount_field in NESTED_AMOUNT_FIELDS.items():
+                # Through getattr so a LazyProduct validates the deferred field first
+                nested = getattr(product, field)
+                if nested is None:
+                    continue
+                for model in nested if isinstance(nested, list) else (nested,):
+                    amount = model.__dict__[amount_field]
+                    if amount is not None:
+                        yield amount
+
+    def _convert_nested(self, model: BaseModel, field: str, converted: dict[Amount, Amount]) -> BaseModel:
+        # Shipping and Tax entries are shared between products, so each instance is only rebuilt once
+        cached = self._nested.get(id(model))
+        if cached is not None:
+            return cached[1]
+        amount = model.__dict__[field]
+        result = model if amount is None else _replace(model, {field: converted[amount]})
+        # Holding on to the original keeps its id from being reused while the cache lives
+        self._nested[id(model)] = (model, result)
+        return result
+
+    def convert_product(self, product: Product, converted: dict[Amount, Amount]) -> Product:
+        values = product.__dict__
+        update: dict[str, Any] = {}
+        for field in AMOUNT_FIELDS:
+            if values[field] is not None:
+                update[field] = converted[values[field]]
+        for field, amount_field in NESTED_AMOUNT_FIELDS.items():
+            nested = getattr(product, field)
+            if nested is None:
+                continue
+            if isinstance(nested, list):
+                update[field] = [self._convert_nested(m, amount_field, converted) for m in nested]
+            else:
+                update[field] = self._convert_nested(nested, amount_field, converted)
+        return _replace(product, update) if update else product
+
+    def convert(self, products: Iterable[Product]) -> list[Product]:
+        products = list(products)
+        amounts = list(self._amounts(products))
+        distinct = len(self._converted)
+        converted = self.convert_amounts(amounts)
+
+        stats = self.stats
+        stats.products += len(products)
+        stats.amounts += len(amounts)
+        stats.distinct += len(converted) - distinct
+        return [self.convert_product(product, converted) for product in products]
+
+    def convert_catalog(self, catalog: Catalog) -> Catalog:
+        return Catalog(self.convert(catalog), tuple(catalog._indexes))
+
+    def clear(self):
+        self._converted.clear()
+        self._nested.clear()
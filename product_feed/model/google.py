@@ -6,11 +6,9 @@ from typing import Tuple
 import re
 
 from pydantic import BaseModel, validator, HttpUrl
-import dateutil.parser
-from iso4217 import Currency
-from iso3166 import Country, countries_by_alpha2
+from .parsing import AmountType, CountryType, Interner, ParseCache, parse_amount, parse_country, parse_datetime, to_decimal
 
-Amount = Tuple[Decimal, Currency]
+Amount = AmountType
 
 class Tax(BaseModel):
     country: str | None
@@ -23,8 +21,13 @@ class Tax(BaseModel):
 
     tax_ship: bool | None
 
+    class Config:
+        # Instances are shared between products through parse_tax
+        frozen = True
+        copy_on_model_validation = 'none'
+
 class Shipping(BaseModel):
-    country: Country
+    country: CountryType
 
     region: str | None
     postal_code: str | None
@@ -40,6 +43,11 @@ class Shipping(BaseModel):
     min_transit_time: int | None
     max_transit_time: int | None
 
+    class Config:
+        # Instances are shared between products through parse_shipping
+        frozen = True
+        copy_on_model_validation = 'none'
+
 class Pause(Enum):
     ADS = 'ads'
     ALL = 'all'
@@ -136,7 +144,7 @@ class LoyaltyPoints(BaseModel):
         super().__init__(
             name=None if name == '' else name,
             points_value=points_value,
-            ratio=Decimal(1.0) if ratio == '' else Decimal(ratio)
+            ratio=Decimal(1.0) if ratio == '' else to_decimal(ratio, 'loyalty points ratio')
         )
         
 
@@ -190,44 +198,129 @@ class Unit(Enum):
     # Per unit
     CT = 'ct'
 
+def _unit(v: str) -> Unit:
+    v = v.lower()
+    return Unit('lb' if v == 'lbs' else v)
+
+_BASE_MEASURE = re.compile(r"^(\d+)(\w+)$")
+
+def _base_measure(v: str) -> Tuple[int, Unit] | None:
+    m = _BASE_MEASURE.match(v)
+    if m is None:
+        return None
+    return (int(m[1]), Unit(m[2]))
+
+parse_unit = ParseCache(_unit, 256, name='unit')
+parse_base_measure = ParseCache(_base_measure, 1024, name='base_measure')
+
+def _shipping(v: str) -> Shipping:
+    p = v.split(':', 4)
+    assert len(p) in (3, 4), 'shipping must be in the format "country:region:service[:price]"'
+    price = None
+    if len(p) == 4:
+        price = parse_amount(p[3])
+        assert price, 'price of shipping must be in the format "0.00 USD"'
+    return Shipping(
+        country=parse_country(p[0]),
+        region=None if p[1] == '' else p[1],
+        service=p[2],
+        price=price
+    )
+
+def _tax(v: str) -> Tax:
+    p = v.split(':', 4)
+    assert len(p) == 4, 'tax must be in the format "country:region:rate:tax_ship"'
+    tax_ship = None
+    p[3] = p[3].lower()
+    if p[3] == 'true' or p[3] == 'yes':
+        tax_ship = True
+    elif p[3] == 'false' or p[3] == 'no':
+        tax_ship = False
+    return Tax(
+        country=p[0],
+        region=p[1],
+        rate=to_decimal(p[2], 'tax rate'),
+        tax_ship=tax_ship
+    )
+
+GTIN_LENGTHS = (8, 12, 13, 14)
+
+def gtin_check_digit(gtin: str) -> bool:
+    # GS1 mod 10: from the right the check digit weighs 1, then the weights alternate 3, 1, 3, ...
+    # isdigit() also accepts digits like '²' or '٣', which are never part of a GTIN
+    return gtin.isascii() and (sum(map(int, gtin[-1::-2])) + 3 * sum(map(int, gtin[-2::-2]))) % 10 == 0
+
+# The same few shipping and tax entries repeat across a whole feed
+parse_shipping = Interner(_shipping, 4096, name='shipping')
+parse_tax = Interner(_tax, 1024, name='tax')
+
+# Character limits of the raw attribute values, shared with the batch and pre-screen validators
+MAX_LENGTH = {
+    'id': 50,
+    'title': 150,
+    'description': 5000,
+    'link': 2000,
+    'image_link': 2000,
+    'additional_image_link': 2000,
+    'mobile_link': 2000,
+    'availability_date': 25,
+    'expiration_date': 25,
+    'product_type': 750,
+    'brand': 70,
+    'mpn': 70,
+    'color': 100,
+    'material': 200,
+    'pattern': 100,
+    'size': 100,
+    'item_group_id': 50,
+    'ads_redirect': 2000,
+    'custom_label_0': 100,
+    'custom_label_1': 100,
+    'custom_label_2': 100,
+    'custom_label_3': 100,
+    'custom_label_4': 100,
+    'shipping_label': 100,
+    'transit_time_label': 100,
+    'tax_category': 100,
+}
 
 class Product(BaseModel):
     # Basic product data
     id: str
     @validator('id')
     def id_len(cls, v):
-        assert len(v) <= 50, 'id must be less than 50 characters'
+        assert len(v) <= MAX_LENGTH['id'], 'id must be less than 50 characters'
         return v
 
     title: str
     @validator('title')
     def title_len(cls, v):
-        assert len(v) <= 150, 'title must be less than 150 characters'
+        assert len(v) <= MAX_LENGTH['title'], 'title must be less than 150 characters'
         return v
 
     description: str
     @validator('description')
     def description_len(cls, v):
-        assert len(v) <= 5000, 'description must be less than 5000 characters'
+        assert len(v) <= MAX_LENGTH['description'], 'description must be less than 5000 characters'
         return v
 
     link: HttpUrl
     @validator('link')
     def link_len(cls, v):
-        assert len(v) <= 2000, 'link must be less than 2000 characters'
+        assert len(v) <= MAX_LENGTH['link'], 'link must be less than 2000 characters'
         return v
 
     image_link: HttpUrl
     @validator('image_link')
     def image_link_len(cls, v):
-        assert len(v) <= 2000, 'image_link must be less than 2000 characters'
+        assert len(v) <= MAX_LENGTH['image_link'], 'image_link must be less than 2000 characters'
         return v
 
     additional_image_link: list[HttpUrl] | None
     @validator('additional_image_link', pre=True)
     def additional_image_link_format(cls, v):
         if v and isinstance(v, str):
-            assert len(v) <= 2000, 'additional_image_link must be less than 2000 characters'
+            assert len(v) <= MAX_LENGTH['additional_image_link'], 'additional_image_link must be less than 2000 characters'
             # When it is from CSV, it is a string and should be converted to a list by splitting on commas
             # The list is then validated to ensure it is less than 10 items
             v = v.split(',', 10)[:10]
@@ -237,7 +330,7 @@ class Product(BaseModel):
     @validator('mobile_link')
     def mobile_link_len(cls, v):
         if v:
-            assert len(v) <= 2000, 'mobile_link must be less than 2000 characters'
+            assert len(v) <= MAX_LENGTH['mobile_link'], 'mobile_link must be less than 2000 characters'
         return v
 
     # Price and availability
@@ -246,41 +339,39 @@ class Product(BaseModel):
     @validator('availability_date', pre=True)
     def availability_date_format(cls, v):
         if v and isinstance(v, str):
-            assert len(v) <= 25, 'availability_date must be less than 25 characters'
-            v = dateutil.parser.parse(v)
+            assert len(v) <= MAX_LENGTH['availability_date'], 'availability_date must be less than 25 characters'
+            v = parse_datetime(v)
         return v
 
     cost_of_goods_sold: Amount | None
     @validator('cost_of_goods_sold', pre=True)
     def cost_of_goods_sold_format(cls, v):
         if v:
-            parsed = v.split(' ', 1)
-            assert len(parsed) == 2, 'cost_of_goods_sold must be in the format "0.00 USD"'
-            v = (Decimal(parsed[0]), Currency(parsed[1]))
+            v = parse_amount(v)
+            assert v, 'cost_of_goods_sold must be in the format "0.00 USD"'
         return v
 
     expiration_date: datetime | None
     @validator('expiration_date', pre=True)
     def expiration_date_format(cls, v):
         if v:
-            assert len(v) <= 25, 'expiration_date must be less than 25 characters'
-            v = dateutil.parser.parse(v)
+            assert len(v) <= MAX_LENGTH['expiration_date'], 'expiration_date must be less than 25 characters'
+            v = parse_datetime(v)
         return v
 
     price: Amount
     @validator('price', pre=True)
     def price_format(cls, v):
-        parsed = v.split(' ', 1)
-        assert len(parsed) == 2, 'price must be in the format "0.00 USD"'
-        return (Decimal(parsed[0]), Currency(parsed[1]))
+        v = parse_amount(v)
+        assert v, 'price must be in the format "0.00 USD"'
+        return v
 
     sale_price: Amount | None
     @validator('sale_price', pre=True)
     def sale_price_format(cls, v):
         if v:
-            parsed = v.split(' ', 1)
-            assert len(parsed) == 2, 'sale_price must be in the format "0.00 USD"'
-            v = (Decimal(parsed[0]), Currency(parsed[1]))
+            v = parse_amount(v)
+            assert v, 'sale_price must be in the format "0.00 USD"'
         return v
 
     sale_price_effective_date: Tuple[datetime, datetime] | None
@@ -289,28 +380,22 @@ class Product(BaseModel):
         if v:
             parsed = v.split('/', 1)
             assert len(parsed) == 2, 'sale_price_effective_date must be in the format "2020-01-01/2020-01-31"'
-            v = (dateutil.parser.parse(parsed[0]), dateutil.parser.parse(parsed[1]))
+            v = (parse_datetime(parsed[0]), parse_datetime(parsed[1]))
         return v
 
     unit_pricing_measure: Unit | None
     @validator('unit_pricing_measure', pre=True)
     def unit_pricing_measure_format(cls, v):
         if v:
-            v = v.lower()
-            v = 'lb' if v == 'lbs' else v
-            v = Unit(v)
+            v = parse_unit(v)
         return v
 
     unit_pricing_base_measure: Tuple[int, Unit] | None
     @validator('unit_pricing_base_measure', pre=True)
     def unit_pricing_base_measure_format(cls, v):
         if v:
-            p = re.compile(r"^(\d+)(\w+)$")
-            m = p.match(v)
-            assert m, 'unit_pricing_base_measure must be in the format "[integer][unit]" such as "15kg"'
-            g = m.groups()
-            assert len(g) == 2, 'unit_pricing_base_measure must be in the format "[integer][unit] such as "15kg"'
-            v = (int(g[0]), Unit(g[1]))
+            v = parse_base_measure(v)
+            assert v, 'unit_pricing_base_measure must be in the format "[integer][unit]" such as "15kg"'
         return v
 
     installment: Installment | None
@@ -319,11 +404,11 @@ class Product(BaseModel):
         if v and isinstance(v, str):
             parsed = v.split(':', 1)
             assert len(parsed) == 2, 'installment must be in the format "3:10.00 USD"'
-            amount = parsed[1].split(' ', 1)
-            assert len(amount) == 2, 'amount of installment must be in the format "10.00 USD"'
+            amount = parse_amount(parsed[1])
+            assert amount, 'amount of installment must be in the format "10.00 USD"'
             v = Installment(
                 months=int(parsed[0]),
-                amount=(Decimal(amount[0]), Currency(amount[1]))
+                amount=amount
             )
         return v
 
@@ -333,12 +418,12 @@ class Product(BaseModel):
         if v and isinstance(v, str):
             parsed = v.split(':', 2)
             assert len(parsed) == 3, 'subscription_cost must be in the format "month:12:10.00 USD"'
-            amount = parsed[2].split(' ', 1)
-            assert len(amount) == 2, 'amount of subscription_cost must be in the format "10.00 USD"'
+            amount = parse_amount(parsed[2])
+            assert amount, 'amount of subscription_cost must be in the format "10.00 USD"'
             v = SubscriptionCost(
                 period=SubscriptionCost.Period(parsed[0]),
                 period_length=int(parsed[1]),
-                amount=(Decimal(amount[0]), Currency(amount[1]))
+                amount=amount
             )
         return v
 
@@ -361,7 +446,7 @@ class Product(BaseModel):
     @validator('product_type', pre=True)
     def product_type_format(cls, v):
         if v:
-            assert len(v) <= 750, 'product_type must be less than 750 characters'
+            assert len(v) <= MAX_LENGTH['product_type'], 'product_type must be less than 750 characters'
             v = v.split(',', 5)[:5]
         return v
 
@@ -370,7 +455,7 @@ class Product(BaseModel):
     @validator('brand')
     def brand_len(cls, v):
         if v:
-            assert len(v) <= 70, 'brand must be less than 70 characters'
+            assert len(v) <= MAX_LENGTH['brand'], 'brand must be less than 70 characters'
         return v
 
     gtin: list[str] | None
@@ -379,14 +464,15 @@ class Product(BaseModel):
         if v and isinstance(v, str):
             v = [''.join(c for c in v if c.isdigit())]
             for gtin in v:
-                assert len(gtin) == 14 or len(gtin) == 13 or len(gtin) == 12 or len(gtin) == 8, 'gtin must be 8, 12, 13, or 14 digits'
+                assert len(gtin) in GTIN_LENGTHS, 'gtin must be 8, 12, 13, or 14 digits'
+                assert gtin_check_digit(gtin), 'gtin has an invalid check digit'
         return v
 
     mpn: str | None
     @validator('mpn')
     def mpn_len(cls, v):
         if v:
-            assert len(v) <= 70, 'mpn must be less than 70 characters'
+            assert len(v) <= MAX_LENGTH['mpn'], 'mpn must be less than 70 characters'
         return v
 
     identifier_exists: bool | None
@@ -405,7 +491,7 @@ class Product(BaseModel):
     @validator('color', pre=True)
     def color_format(cls, v):
         if v:
-            assert len(v) <= 100, 'color must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['color'], 'color must be less than 100 characters'
             v = v.split('/', 3)[:3]
         return v
 
@@ -414,21 +500,21 @@ class Product(BaseModel):
     @validator('material')
     def material_len(cls, v):
         if v:
-            assert len(v) <= 200, 'material must be less than 200 characters'
+            assert len(v) <= MAX_LENGTH['material'], 'material must be less than 200 characters'
         return v
 
     pattern: str | None
     @validator('pattern')
     def pattern_len(cls, v):
         if v:
-            assert len(v) <= 100, 'pattern must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['pattern'], 'pattern must be less than 100 characters'
         return v
 
     size: str | None
     @validator('size')
     def size_len(cls, v):
         if v:
-            assert len(v) <= 100, 'size must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['size'], 'size must be less than 100 characters'
         return v
 
     size_type: list[SizeType] | None
@@ -443,7 +529,7 @@ class Product(BaseModel):
     @validator('item_group_id')
     def item_group_id_len(cls, v):
         if v:
-            assert len(v) <= 50, 'item_group_id must be less than 50 characters'
+            assert len(v) <= MAX_LENGTH['item_group_id'], 'item_group_id must be less than 50 characters'
         return v
 
     product_length: Tuple[str, LenUnit] | None
@@ -496,7 +582,7 @@ class Product(BaseModel):
     @validator('ads_redirect')
     def ads_redirect_len(cls, v):
         if v:
-            assert len(v) <= 2000, 'ads_redirect must be less than 2000 characters'
+            assert len(v) <= MAX_LENGTH['ads_redirect'], 'ads_redirect must be less than 2000 characters'
         return v
 
     custom_label_0: str | None
@@ -505,9 +591,9 @@ class Product(BaseModel):
     custom_label_3: str | None
     custom_label_4: str | None
     @validator('custom_label_0', 'custom_label_1', 'custom_label_2', 'custom_label_3', 'custom_label_4')
-    def custom_label_len(cls, v):
+    def custom_label_len(cls, v, field):
         if v:
-            assert len(v) <= 100, 'custom_label_0, custom_label_1, custom_label_2, custom_label_3, custom_label_4 must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH[field.name], 'custom_label_0, custom_label_1, custom_label_2, custom_label_3, custom_label_4 must be less than 100 characters'
         return v
 
     promotion_id: list[str] | None
@@ -533,19 +619,19 @@ class Product(BaseModel):
             v = ret[:6]
         return v
 
-    shopping_ads_excluded_country: list[Country] | None
+    shopping_ads_excluded_country: list[CountryType] | None
     @validator('shopping_ads_excluded_country', pre=True)
     def shopping_ads_excluded_country_format(cls, v):
         if v and isinstance(v, str):
             parsed = v.split(',', 100)[:100]
             ret = []
             for country in parsed:
-                ret.append(countries_by_alpha2[country])
+                ret.append(parse_country(country))
             v = ret[:100]
         elif v and isinstance(v, list):
             ret = []
             for country in v:
-                ret.append(countries_by_alpha2[country])
+                ret.append(parse_country(country))
             v = ret[:100]
         return v
     pause: Pause | None
@@ -558,15 +644,7 @@ class Product(BaseModel):
             parsed = v.split(',', 100)[:100]
             ret = []
             for shipping in parsed:
-                p = shipping.split(':', 4)
-                assert len(p) == 4, 'shipping must be in the format "country:region:service:price"'
-                price = p[3].split(' ', 1)
-                ret.append(Shipping(
-                    country=countries_by_alpha2[p[0]],
-                    region=None if p[1] == '' else p[1],
-                    service=p[2],
-                    price=(Decimal(price[0]), Currency(price[1]))
-                ))
+                ret.append(parse_shipping(shipping))
             v = ret[:100]
         elif v and isinstance(v, list):
             ret = []
@@ -580,7 +658,7 @@ class Product(BaseModel):
     @validator('shipping_label')
     def shipping_label_len(cls, v):
         if v:
-            assert len(v) <= 100, 'shipping_label must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['shipping_label'], 'shipping_label must be less than 100 characters'
         return v
 
     shipping_weight: Tuple[str, WeightUnit] | None
@@ -611,18 +689,18 @@ class Product(BaseModel):
             v = (parsed[0], LenUnit(parsed[1]))
         return v
 
-    ships_from_country: Country | None
+    ships_from_country: CountryType | None
     @validator('ships_from_country', pre=True)
     def ships_from_country_format(cls, v):
         if v:
-            v = countries_by_alpha2[v]
+            v = parse_country(v)
         return v
 
     transit_time_label: str | None
     @validator('transit_time_label')
     def transit_time_label_len(cls, v):
         if v:
-            assert len(v) <= 100, 'transit_time_label must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['transit_time_label'], 'transit_time_label must be less than 100 characters'
         return v
 
     max_handling_time: int | None
@@ -641,20 +719,7 @@ class Product(BaseModel):
             parsed = v.split(',', 100)[:100]
             ret = []
             for tax in parsed:
-                p = tax.split(':', 4)
-                assert len(p) == 4, 'tax must be in the format "country:region:rate:tax_ship"'
-                tax_ship = None
-                p[3] = p[3].lower()
-                if p[3] == 'true' or p[3] == 'yes':
-                    tax_ship = True
-                elif p[3] == 'false' or p[3] == 'no':
-                    tax_ship = False
-                ret.append(Tax(
-                    country=p[0],
-                    region=p[1],
-                    rate=Decimal(p[2]),
-                    tax_ship=tax_ship
-                ))
+                ret.append(parse_tax(tax))
             v = ret[:100]
         elif v and isinstance(v, list):
             ret = []
@@ -666,7 +731,7 @@ class Product(BaseModel):
     @validator('tax_category')
     def tax_category_len(cls, v):
         if v:
-            assert len(v) <= 100, 'tax_category must be less than 100 characters'
+            assert len(v) <= MAX_LENGTH['tax_category'], 'tax_category must be less than 100 characters'
         return v
 
     @validator('adult', 'identifier_exists', 'is_bundle', pre=True)
@@ -0,0 +1,74 @@
+from typing import Any
+
+from pydantic import PrivateAttr, ValidationError
+
+from .google import Product
+
+# Optional fields that build nested models or parse dates, validated on first access
+DEFERRED_FIELDS = frozenset({
+    'additional_image_link',
+    'availability_date',
+    'expiration_date',
+    'sale_price_effective_date',
+    'installment',
+    'subscription_cost',
+    'loyalty_points',
+    'product_detail',
+    'shopping_ads_excluded_country',
+    'shipping',
+    'tax',
+})
+
+class LazyProduct(Product):
+    _deferred: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, **data):
+        deferred = {k: data.pop(k) for k in DEFERRED_FIELDS & data.keys()}
+        super().__init__(**data)
+        # Without a value in __dict__ the first attribute access falls through to __getattr__
+        for name in deferred:
+            del self.__dict__[name]
+        self.__fields_set__.update(deferred)
+        self._deferred = deferred
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_') or name not in self._deferred:
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+        self._validate_field(name)
+        return self.__dict__[name]
+
+    def __setattr__(self, name, value):
+        if not name.startswith('_'):
+            self._deferred.pop(name, None)
+        super().__setattr__(name, value)
+
+    def _validate_field(self, name: str):
+        field = self.__fields__[name]
+        value, errors = field.validate(self._deferred[name], self.__dict__, loc=name, cls=type(self))
+        if errors:
+            raise ValidationError([errors], type(self))
+        self.__dict__[name] = value
+        del self._deferred[name]
+
+    @property
+    def pending(self) -> frozenset[str]:
+        return frozenset(self._deferred)
+
+    def validate_all(self) -> 'LazyProduct':
+        errors = []
+        for name in list(self._deferred):
+            try:
+                self._validate_field(name)
+            except ValidationError as e:
+                errors.extend(e.raw_errors)
+        if errors:
+            raise ValidationError(errors, type(self))
+        # Restore the declared field order for dict() and json()
+        values = self.__dict__
+        object.__setattr__(self, '__dict__', {name: values[name] for name in self.__fields__})
+        return self
+
+    def _iter(self, *args, **kwargs):
+        if self._deferred:
+            self.validate_all()
+        return super()._iter(*args, **kwargs)
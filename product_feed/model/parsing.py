@@ -0,0 +1,240 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Generic, TypeVar
+import re
+import sys
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from iso4217 import Currency
+    from iso3166 import Country
+
+T = TypeVar('T')
+
+_caches: dict[str, 'ParseCache'] = {}
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+class ParseCache(Generic[T]):
+    # Parsed values are shared between every caller, so `parse` must return immutable values
+    def __init__(self, parse: Callable[[str], T], maxsize: int = 4096, name: str | None = None):
+        self._cached = lru_cache(maxsize)(parse)
+        if name:
+            _caches[name] = self
+
+    def __call__(self, value: str) -> T:
+        return self._cached(value)
+
+    def stats(self) -> dict[str, int]:
+        info = self._cached.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+    def clear(self):
+        self._cached.cache_clear()
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    # Enum members, classes and other module level singletons are shared, so they are not counted
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, (Enum, type)) or obj is None:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif isinstance(obj, BaseModel):
+        size += deep_sizeof(obj.__dict__, seen) + deep_sizeof(obj.__fields_set__, seen)
+    return size
+
+class Interner(ParseCache[T]):
+    """ParseCache for nested values repeated across products, e.g. shipping and tax entries.
+
+    Each distinct string is parsed once and every product holding it gets the same
+    instance, so `parse` must return frozen models. `saved_bytes` estimates the memory
+    that cache hits did not allocate, from the mean deep size of the parsed values.
+    """
+
+    def __init__(self, parse: Callable[[str], T], maxsize: int = 4096, name: str | None = None):
+        super().__init__(self._create, maxsize, name)
+        self._parse = parse
+        self.created_bytes = 0
+
+    def _create(self, value: str) -> T:
+        parsed = self._parse(value)
+        self.created_bytes += deep_sizeof(parsed)
+        return parsed
+
+    def stats(self) -> dict[str, int]:
+        stats = super().stats()
+        misses = stats['misses']
+        stats['saved_bytes'] = stats['hits'] * self.created_bytes // misses if misses else 0
+        return stats
+
+    def clear(self):
+        super().clear()
+        self.created_bytes = 0
+
+# YYYY-MM-DD, optionally followed by THH:MM[:SS[.ffffff]] and Z, ±HHMM or ±HH:MM
+_ISO_DATETIME = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?'
+    r'(?:(Z)|([+-])(\d{2}):?(\d{2}))?)?'
+)
+
+@lru_cache(maxsize=None)
+def _tz(sign: str, hours: str, minutes: str) -> timezone:
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    return timezone(-offset if sign == '-' else offset)
+
+class DateParser(ParseCache[datetime]):
+    def __init__(self, maxsize: int = 4096, name: str | None = None):
+        super().__init__(self._parse, maxsize, name)
+        self.fast = 0
+        self.fallback = 0
+
+    def __call__(self, value: str) -> datetime:
+        # The cache remembers the path each value took, so cache hits are counted too
+        parsed, fast = self._cached(value)
+        if fast:
+            self.fast += 1
+        else:
+            self.fallback += 1
+        return parsed
+
+    def _parse(self, value: str) -> tuple[datetime, bool]:
+        m = _ISO_DATETIME.fullmatch(value)
+        if m is None:
+            # dateutil costs ~10ms to import and most feeds never need it
+            import dateutil.parser
+            return dateutil.parser.parse(value), False
+
+        year, month, day, hour, minute, second, fraction, utc, sign, tz_hours, tz_minutes = m.groups()
+        tzinfo = None
+        if utc:
+            tzinfo = timezone.utc
+        elif sign:
+            tzinfo = _tz(sign, tz_hours, tz_minutes)
+        return datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int(fraction.ljust(6, '0')) if fraction else 0,
+            tzinfo=tzinfo,
+        ), True
+
+    def stats(self) -> dict[str, int]:
+        return {**super().stats(), 'fast': self.fast, 'fallback': self.fallback}
+
+    def clear(self):
+        super().clear()
+        self.fast = 0
+        self.fallback = 0
+
+parse_datetime = DateParser(name='datetime')
+
+def to_decimal(value: str, name: str = 'decimal amount') -> Decimal:
+    # Decimal raises InvalidOperation, which pydantic does not turn into a validation error
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'"{value}" is not a valid {name}')
+
+def _amount(value: str) -> 'tuple[Decimal, Currency] | None':
+    from iso4217 import Currency
+
+    parsed = value.split(' ', 1)
+    if len(parsed) != 2:
+        return None
+    return (to_decimal(parsed[0]), Currency(parsed[1]))
+
+def _country(value: str) -> 'Country':
+    from iso3166 import countries_by_alpha2
+
+    country = countries_by_alpha2.get(value)
+    if country is None:
+        raise ValueError(f'"{value}" is not a valid ISO 3166-1 alpha-2 country code')
+    return country
+
+# Returns None when the value is not in the "0.00 USD" shape so each validator can report its own message
+parse_amount = ParseCache(_amount, 16384, name='amount')
+parse_country = ParseCache(_country, 1024, name='country')
+
+# Field types standing in for iso4217.Currency and iso3166.Country, so the tables are only loaded
+# once a product actually carries an amount or a country instead of when the model is imported
+if TYPE_CHECKING:
+    CurrencyType = Currency
+    CountryType = Country
+    AmountType = tuple[Decimal, Currency]
+else:
+    class CurrencyType:
+        @classmethod
+        def __get_validators__(cls):
+            yield cls.validate
+
+        @classmethod
+        def validate(cls, v: Any) -> 'Currency':
+            from iso4217 import Currency
+            return v if isinstance(v, Currency) else Currency(v)
+
+        @classmethod
+        def __modify_schema__(cls, field_schema: dict[str, Any]):
+            from iso4217 import Currency
+            field_schema.update(type='string', enum=[c.code for c in Currency])
+
+    class CountryType:
+        @classmethod
+        def __get_validators__(cls):
+            yield cls.validate
+
+        @classmethod
+        def validate(cls, v: Any) -> 'Country':
+            from iso3166 import Country
+            if isinstance(v, Country):
+                return v
+            if isinstance(v, str):
+                return parse_country(v)
+            return Country(*v)
+
+        @classmethod
+        def __modify_schema__(cls, field_schema: dict[str, Any]):
+            # The shape Country had as a NamedTuple field
+            from iso3166 import Country
+            field_schema.update(
+                type='array',
+                items=[{'title': name.replace('_', ' ').title(), 'type': 'string'} for name in Country._fields],
+                minItems=len(Country._fields),
+                maxItems=len(Country._fields),
+            )
+
+    class AmountType:
+        # Passes the tuples cached by parse_amount through as they are, so products share them
+        @classmethod
+        def __get_validators__(cls):
+            yield cls.validate
+
+        @classmethod
+        def validate(cls, v: Any) -> 'tuple[Decimal, Currency]':
+            if isinstance(v, str):
+                parsed = parse_amount(v)
+                if parsed is None:
+                    raise ValueError('amount must be in the format "0.00 USD"')
+                return parsed
+            amount, currency = v
+            currency = CurrencyType.validate(currency)
+            if isinstance(amount, Decimal):
+                return v if type(v) is tuple and v[1] is currency else (amount, currency)
+            try:
+                return (Decimal(str(amount)), currency)
+            except InvalidOperation:
+                raise ValueError(f'"{amount}" is not a valid decimal amount')
+
+        @classmethod
+        def __modify_schema__(cls, field_schema: dict[str, Any]):
+            currency: dict[str, Any] = {}
+            CurrencyType.__modify_schema__(currency)
+            field_schema.update(type='array', items=[{'type': 'number'}, currency], minItems=2, maxItems=2)
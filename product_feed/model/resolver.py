@@ -0,0 +1,287 @@
+"""Shipping and tax lookup for a destination.
+
+Each distinct list of Shipping or Tax rules is compiled once into a `RuleIndex`,
+grouped by country and then by postal code, postal code prefix, postal code
+range and region. Products share rule lists through parse_shipping and
+parse_tax, so a feed usually compiles a handful of indexes however many products
+it holds. A lookup is a few dict lookups plus a bisect over the postal code
+ranges of the country.
+
+Rules matched by `location_id` or `location_group_name` refer to locations
+defined in Merchant Center, not in the feed, and are left out of the index.
+"""
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Sequence, TypeVar
+
+from .google import Product, Shipping, Tax
+
+if TYPE_CHECKING:
+    from iso3166 import Country
+    from iso4217 import Currency
+
+    from .currency import CurrencyConverter
+
+Rule = TypeVar('Rule', Shipping, Tax)
+
+def _country_key(country: 'Country | str | None') -> str | None:
+    if country is None or country == '':
+        return None
+    return country.upper() if isinstance(country, str) else country.alpha2
+
+def _postal_key(postal_code: str | None) -> str | None:
+    # 'SW1A 1AA' and 'sw1a1aa' are the same UK postal code
+    return postal_code.replace(' ', '').upper() if postal_code else None
+
+def _postal_like(value: str) -> bool:
+    return '*' in value or any(c.isdigit() for c in value)
+
+def _range(postal_code: str) -> tuple[str, str, bool] | None:
+    # The ends and whether they are prefixes, or None when the two ends cannot bound a range
+    start, _, end = postal_code.partition('-')
+    prefix = start.endswith('*')
+    start, end = start.rstrip('*'), end.rstrip('*')
+    if not start or len(start) != len(end) or start > end:
+        return None
+    return start, end, prefix
+
+class _Ranges:
+    # Postal code ranges of one shape, e.g. '94002-94110' or the prefixes in '94*-95*'.
+    # The range ends cut the codes into segments, each holding the rules that cover all of it
+    def __init__(self, length: int, prefix: bool, ranges: list[tuple[str, str, Rule]]):
+        self.length = length
+        self.prefix = prefix
+        self.points = sorted({p for start, end, _ in ranges for p in (start, end)})
+        # at[i] covers points[i], before[i] the codes between points[i - 1] and points[i]
+        self.at = [tuple(r for start, end, r in ranges if start <= p <= end) for p in self.points]
+        self.before = [()] + [
+            tuple(r for start, end, r in ranges if start <= low and high <= end)
+            for low, high in zip(self.points, self.points[1:])
+        ]
+
+    def match(self, postal_code: str) -> tuple[Rule, ...]:
+        if self.prefix:
+            if len(postal_code) < self.length:
+                return ()
+            postal_code = postal_code[:self.length]
+        elif len(postal_code) != self.length:
+            return ()
+        i = bisect_left(self.points, postal_code)
+        if i < len(self.points) and self.points[i] == postal_code:
+            return self.at[i]
+        return self.before[i] if i < len(self.points) else ()
+
+class _CountryRules:
+    def __init__(self):
+        self.everywhere: list[Rule] = []
+        self.regions: dict[str, list[Rule]] = {}
+        self.postal_codes: dict[str, list[Rule]] = {}
+        self.prefixes: dict[str, list[Rule]] = {}
+        self.prefix_lengths: list[int] = []
+        self.ranges: list[_Ranges] = []
+        self._range_rules: list[tuple[str, str, Rule]] = []
+
+    def add(self, rule: Rule):
+        postal_code = _postal_key(rule.postal_code)
+        region = rule.region.upper() if rule.region else None
+        if postal_code is not None:
+            region = None
+        elif region is not None and _postal_like(region):
+            # The feed format has one slot for a region, postal code or location, which parse_shipping
+            # and parse_tax keep as the region. Plain values such as '13' can be a numeric ISO 3166-2
+            # region as well, so those are indexed both ways
+            postal_code = _postal_key(region)
+            if '-' in postal_code and _range(postal_code) is None:
+                # Not a postal code range but an ISO 3166-2 subdivision, e.g. 'FR-75'
+                postal_code = None
+            elif '*' in region or '-' in region:
+                region = None
+
+        if postal_code is not None:
+            self._add_postal(postal_code, rule)
+        if region is not None:
+            self.regions.setdefault(region, []).append(rule)
+        elif postal_code is None:
+            self.everywhere.append(rule)
+
+    def _add_postal(self, postal_code: str, rule: Rule):
+        start, _, end = postal_code.partition('-')
+        if end:
+            self._range_rules.append((start, end, rule))
+        elif start.endswith('*'):
+            self.prefixes.setdefault(start[:-1], []).append(rule)
+        else:
+            self.postal_codes.setdefault(start, []).append(rule)
+
+    def compile(self):
+        # Longest prefix first, exact ranges before prefix ranges
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+        shapes: dict[tuple[bool, int], list[tuple[str, str, Rule]]] = {}
+        for start, end, rule in self._range_rules:
+            bounds = _range(f'{start}-{end}')
+            if bounds is None:
+                continue
+            start, end, prefix = bounds
+            shapes.setdefault((prefix, len(start)), []).append((start, end, rule))
+        order = sorted(shapes, key=lambda shape: (shape[0], -shape[1]))
+        self.ranges = [_Ranges(length, prefix, shapes[prefix, length]) for prefix, length in order]
+        self._range_rules = []
+
+    def match(self, region: str | None, postal_code: str | None) -> tuple[Rule, ...]:
+        if postal_code is not None:
+            rules = self.postal_codes.get(postal_code)
+            if rules:
+                return tuple(rules)
+            for length in self.prefix_lengths:
+                rules = self.prefixes.get(postal_code[:length])
+                if rules:
+                    return tuple(rules)
+            for ranges in self.ranges:
+                rules = ranges.match(postal_code)
+                if rules:
+                    return rules
+        if region is not None:
+            rules = self.regions.get(region)
+            if rules:
+                return tuple(rules)
+        return tuple(self.everywhere)
+
+class RuleIndex:
+    """The rules of one `shipping` or `tax` list, indexed by destination.
+
+    `match()` returns the rules of the most specific kind that applies: a postal
+    code, then the longest postal code prefix, then a postal code range, then the
+    region and last the rules covering the whole country.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = tuple(rules)
+        self._countries: dict[str, _CountryRules] = {}
+        for rule in self.rules:
+            if rule.location_id or getattr(rule, 'location_group_name', None):
+                continue
+            country = _country_key(rule.country)
+            if country is None:
+                continue
+            rules = self._countries.get(country)
+            if rules is None:
+                rules = self._countries[country] = _CountryRules()
+            rules.add(rule)
+        for rules in self._countries.values():
+            rules.compile()
+
+    def match(self, country: 'Country | str', region: str | None = None, postal_code: str | None = None) -> tuple[Rule, ...]:
+        rules = self._countries.get(_country_key(country))
+        if rules is None:
+            return ()
+        return rules.match(region.upper() if region else None, _postal_key(postal_code))
+
+    def _match(self, country: str | None, region: str | None, postal_code: str | None) -> tuple[Rule, ...]:
+        # With the destination already normalised by the caller
+        rules = self._countries.get(country)
+        return () if rules is None else rules.match(region, postal_code)
+
+    def __len__(self):
+        return len(self.rules)
+
+def cheapest(
+    services: Sequence[Shipping], currency: 'Currency | None' = None, converter: 'CurrencyConverter | None' = None,
+) -> Shipping | None:
+    # Shopping ads show the lowest price when several services ship to the same place. Prices in
+    # different currencies are only compared through `converter`, without one only the services
+    # priced in `currency`, by default that of the first priced service, are compared
+    priced = [s for s in services if s.price is not None]
+    if priced and converter is not None:
+        converted = converter.convert_amounts(s.price for s in priced)
+        return min(priced, key=lambda s: converted[s.price][0])
+    if priced:
+        if currency is None:
+            currency = priced[0].price[1]
+        priced = [s for s in priced if s.price[1] is currency]
+    if priced:
+        return min(priced, key=lambda s: s.price[0])
+    return services[0] if services else None
+
+class Resolution(NamedTuple):
+    shipping: Shipping | None
+    tax: Tax | None
+    services: tuple[Shipping, ...]
+
+class ResolverStats:
+    def __init__(self):
+        self.products = 0
+        self.rule_sets = 0
+
+    def __repr__(self):
+        return f'ResolverStats(products={self.products}, rule_sets={self.rule_sets})'
+
+class DestinationResolver:
+    """Resolves the shipping service and tax rule of products for a destination.
+
+    Rule lists are interned by content, so products whose lists hold equal rules
+    share one `RuleIndex`. Hashing the values of 100 rules costs more than
+    scanning them, so the content is only hashed when two cheaper lookups miss:
+    by the identity of the list, for a product seen before, and by the identities
+    of its rules, which parse_shipping and parse_tax share between products.
+    `clear()` drops them all.
+
+    The cheapest service is picked among those priced in the product's currency,
+    or among all of them with a `converter` to compare their prices.
+    """
+
+    def __init__(self, converter: 'CurrencyConverter | None' = None):
+        self.converter = converter
+        self.stats = ResolverStats()
+        self._indexes: dict[tuple, RuleIndex] = {}
+        # Both hold on to what they key by id, so the ids are not reused while cached
+        self._by_list: dict[int, tuple[list[Rule], RuleIndex]] = {}
+        self._by_rules: dict[tuple[int, ...], tuple[tuple[Rule, ...], RuleIndex]] = {}
+        self._empty = RuleIndex(())
+
+    def index(self, rules: list[Rule] | None) -> RuleIndex:
+        if not rules:
+            return self._empty
+        cached = self._by_list.get(id(rules))
+        if cached is None:
+            ids = tuple(map(id, rules))
+            cached = self._by_rules.get(ids)
+            if cached is None:
+                # Frozen Shipping and Tax hash by their values, and the type keeps a Shipping and a Tax list apart
+                key = (type(rules[0]), *rules)
+                index = self._indexes.get(key)
+                if index is None:
+                    index = self._indexes[key] = RuleIndex(rules)
+                    self.stats.rule_sets += 1
+                cached = self._by_rules[ids] = (tuple(rules), index)
+            self._by_list[id(rules)] = (rules, cached[1])
+        return cached[1]
+
+    def resolve(self, product: Product, country: 'Country | str', region: str | None = None, postal_code: str | None = None) -> Resolution:
+        self.stats.products += 1
+        services = self.index(product.shipping).match(country, region, postal_code)
+        taxes = self.index(product.tax).match(country, region, postal_code)
+        return Resolution(cheapest(services, product.price[1], self.converter), taxes[0] if taxes else None, services)
+
+    def resolve_all(self, products: Iterable[Product], country: 'Country | str', region: str | None = None, postal_code: str | None = None) -> list[Resolution]:
+        # One destination for the whole batch, so each pair of indexes is only matched once
+        country, region, postal_code = _country_key(country), region.upper() if region else None, _postal_key(postal_code)
+        resolved: dict[tuple[int, int, 'Currency'], Resolution] = {}
+        results = []
+        for product in products:
+            shipping, tax = self.index(product.shipping), self.index(product.tax)
+            currency = product.price[1]
+            key = (id(shipping), id(tax), currency)
+            resolution = resolved.get(key)
+            if resolution is None:
+                services = shipping._match(country, region, postal_code)
+                taxes = tax._match(country, region, postal_code)
+                resolution = resolved[key] = Resolution(
+                    cheapest(services, currency, self.converter), taxes[0] if taxes else None, services,
+                )
+            results.append(resolution)
+        self.stats.products += len(results)
+        return results
+
+    def clear(self):
+        self._indexes.clear()
+        self._by_list.clear()
+        self._by_rules.clear()
@@ -0,0 +1,165 @@
+"""Versioned on-disk snapshot of a CompactCatalog.
+
+Layout: 8 byte magic, u32 version, u32 header length, a JSON header describing every
+section, then the sections themselves, each aligned to 8 bytes. Numeric columns are
+raw array buffers and string columns are an offsets array plus a UTF-8 blob, so both
+are memory-mapped and read in place. Snapshots hold already validated products and
+embed pickled values, so only load files written by a trusted process.
+"""
+from array import array
+from importlib import import_module
+from os import PathLike
+from typing import Any, BinaryIO, Iterable, Sequence
+import json
+import mmap
+import pickle
+import struct
+import sys
+
+from .catalog import CompactCatalog
+from .google import Product
+
+MAGIC = b'PFSNAP\x00\x00'
+VERSION = 1
+
+_PREAMBLE = struct.Struct('<8sII')
+_ALIGN = 8
+
+class StringTable(Sequence[str]):
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+class PickleTable(Sequence[Any]):
+    # Empty entries stand for None
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Any:
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return pickle.loads(self._data[start:end]) if end > start else None
+
+def _pack(values: Iterable[bytes]) -> tuple[array, bytes]:
+    offsets = array('Q', [0])
+    chunks = []
+    total = 0
+    for b in values:
+        chunks.append(b)
+        total += len(b)
+        offsets.append(total)
+    return offsets, b''.join(chunks)
+
+def _model_name(model: type) -> str:
+    return f'{model.__module__}:{model.__qualname__}'
+
+def _load_model(name: str) -> type[Product]:
+    module, _, qualname = name.partition(':')
+    obj: Any = import_module(module)
+    for part in qualname.split('.'):
+        obj = getattr(obj, part)
+    return obj
+
+def write_snapshot(catalog: CompactCatalog | Iterable[Product], path: str | PathLike):
+    if not isinstance(catalog, CompactCatalog):
+        catalog = CompactCatalog(catalog)
+
+    sections: list[tuple[str, dict[str, Any], bytes | array | memoryview]] = []
+    for name, column in catalog._arrays.items():
+        # A catalog from load_snapshot holds memoryviews cast to the column type
+        typecode = column.typecode if isinstance(column, array) else column.format
+        sections.append((name, {'kind': 'array', 'typecode': typecode}, column))
+    for name, column in catalog._strings.items():
+        offsets, data = _pack(s.encode() for s in column)
+        sections.append((f'{name}.offsets', {'kind': 'array', 'typecode': 'Q'}, offsets))
+        sections.append((f'{name}.data', {'kind': 'strings', 'column': name}, data))
+    offsets, data = _pack(b'' if e is None else pickle.dumps(e, pickle.HIGHEST_PROTOCOL) for e in catalog._extras)
+    sections.append(('extras.offsets', {'kind': 'array', 'typecode': 'Q'}, offsets))
+    sections.append(('extras.data', {'kind': 'pickles'}, data))
+    sections.append(('tables', {'kind': 'pickle'}, pickle.dumps(catalog._tables, pickle.HIGHEST_PROTOCOL)))
+
+    header: dict[str, Any] = {
+        'rows': len(catalog),
+        'model': _model_name(catalog.model),
+        'byteorder': sys.byteorder,
+        'sections': {},
+    }
+    # Offsets depend on the header length, so lay the sections out relative to the end of the header first
+    position = 0
+    for name, meta, data in sections:
+        meta.update(offset=position, length=memoryview(data).nbytes)
+        header['sections'][name] = meta
+        position += -(-meta['length'] // _ALIGN) * _ALIGN
+
+    encoded = json.dumps(header).encode()
+    start = -(-(_PREAMBLE.size + len(encoded)) // _ALIGN) * _ALIGN
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        _pad(f, start - _PREAMBLE.size - len(encoded))
+        for name, meta, data in sections:
+            f.write(data if isinstance(data, bytes) else data.tobytes())
+            _pad(f, -meta['length'] % _ALIGN)
+
+def _pad(f: BinaryIO, n: int):
+    if n:
+        f.write(b'\x00' * n)
+
+def load_snapshot(path: str | PathLike) -> CompactCatalog:
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+
+    if len(view) < _PREAMBLE.size:
+        raise ValueError(f'{path} is not a catalog snapshot')
+    magic, version, header_len = _PREAMBLE.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a catalog snapshot')
+    if version != VERSION:
+        raise ValueError(f'{path} has snapshot version {version}, expected {VERSION}')
+    if _PREAMBLE.size + header_len > len(view):
+        raise ValueError(f'{path} is truncated')
+    header = json.loads(bytes(view[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    start = -(-(_PREAMBLE.size + header_len) // _ALIGN) * _ALIGN
+    swap = header['byteorder'] != sys.byteorder
+    for meta in header['sections'].values():
+        if start + meta['offset'] + meta['length'] > len(view):
+            raise ValueError(f'{path} is truncated')
+
+    def section(name: str) -> memoryview:
+        meta = header['sections'][name]
+        return view[start + meta['offset']:start + meta['offset'] + meta['length']]
+
+    def column(name: str) -> Sequence[int]:
+        typecode = header['sections'][name]['typecode']
+        if swap:
+            # Foreign byte order cannot be read in place, fall back to a swapped copy
+            a = array(typecode, section(name))
+            a.byteswap()
+            return a
+        return section(name).cast(typecode)
+
+    arrays, strings = {}, {}
+    for name, meta in header['sections'].items():
+        if meta['kind'] == 'strings':
+            strings[meta['column']] = StringTable(column(f"{meta['column']}.offsets"), section(name))
+        elif meta['kind'] == 'array' and not name.endswith('.offsets'):
+            arrays[name] = column(name)
+
+    return CompactCatalog.from_columns(
+        size=header['rows'],
+        strings=strings,
+        arrays=arrays,
+        tables=pickle.loads(section('tables')),
+        extras=PickleTable(column('extras.offsets'), section('extras.data')),
+        model=_load_model(header['model']),
+    )
@@ -0,0 +1,134 @@
+"""Fast construction of models from values that were already validated.
+
+`BaseModel.construct()` leaves nested models as the dicts `.dict()` turned them
+into and skips enum coercion. `TrustedConstructor` generates a builder per model
+from its field definitions that fills those in as well, without running any
+validator. Every other value must already have its field type, as in the output
+of `Product.dict()` or `tuple(product.__dict__.values())`.
+"""
+from enum import Enum
+from typing import Any, Callable, Sequence
+
+from pydantic import BaseModel, ValidationError
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+
+from .google import Product
+
+class TrustedConstructor:
+    def __init__(self, model: type[BaseModel] = Product, check: bool = False):
+        # With check on, every built instance is compared with the output of the validating path
+        self.model = model
+        self.check = check
+        self.fields = tuple(model.__fields__)
+        self._globals: dict[str, Any] = {'__new': object.__new__, '__set': object.__setattr__, '__names': self.fields}
+        self._builders: dict[type[BaseModel], str] = {}
+        self._lines: list[str] = []
+        self._plan: list | None = None
+
+        root = self._builder(model)
+        self._generate_tuple(model, root)
+        self.source = '\n'.join(self._lines)
+        exec(compile(self.source, f'<trusted {model.__name__}>', 'exec'), self._globals)
+        self._from_dict: Callable[[dict], BaseModel] = self._globals[root]
+        self._from_tuple: Callable[[Sequence], BaseModel] = self._globals[f'{root}_tuple']
+
+    def _name(self, obj: type) -> str:
+        name = f'{obj.__name__}_{id(obj):x}'
+        self._globals[name] = obj
+        return name
+
+    def _builder(self, model: type[BaseModel]) -> str:
+        name = self._builders.get(model)
+        if name is None:
+            name = self._builders[model] = f'build_{self._name(model)}'
+            self._generate(model, name)
+        return name
+
+    def _item(self, t: type, x: str) -> str | None:
+        if not isinstance(t, type):
+            return None
+        if issubclass(t, BaseModel):
+            return f'{self._builder(t)}({x}) if type({x}) is dict else {x}'
+        if issubclass(t, Enum):
+            enum = self._name(t)
+            return f'{x} if type({x}) is {enum} else {enum}({x})'
+        return None
+
+    def _convert(self, field: ModelField, var: str) -> str | None:
+        if field.shape == SHAPE_SINGLETON:
+            return self._item(field.type_, var)
+        if field.shape == SHAPE_LIST:
+            item = self._item(field.type_, 'x')
+            return None if item is None else f'[{item} for x in {var}]'
+        return None
+
+    def _body(self, model: type[BaseModel], access: Callable[[int, str], str]) -> list[str]:
+        lines = []
+        values = []
+        for i, (name, field) in enumerate(model.__fields__.items()):
+            var = f'v{i}'
+            lines.append(f'    {var} = {access(i, name)}')
+            convert = self._convert(field, var)
+            if convert is not None:
+                lines.append(f'    if {var} is not None:')
+                lines.append(f'        {var} = {convert}')
+            values.append(f'{name!r}: {var}')
+        lines.append(f'    m = __new({self._name(model)})')
+        lines.append(f"    __set(m, '__dict__', {{{', '.join(values)}}})")
+        return lines
+
+    def _defaults(self, model: type[BaseModel]) -> str:
+        defaults = f'defaults_{self._name(model)}'
+        self._globals[defaults] = {name: field.default for name, field in model.__fields__.items()}
+        return defaults
+
+    def _generate(self, model: type[BaseModel], name: str):
+        defaults = self._defaults(model)
+        lines = [f'def {name}(values):', '    get = values.get']
+        lines += self._body(model, lambda i, field: f'get({field!r}, {defaults}[{field!r}])')
+        lines.append("    __set(m, '__fields_set__', set(values))")
+        if model.__private_attributes__:
+            lines.append('    m._init_private_attributes()')
+        lines.append('    return m')
+        self._lines += lines + ['']
+
+    def _generate_tuple(self, model: type[BaseModel], name: str):
+        lines = [f'def {name}_tuple(values):']
+        lines += self._body(model, lambda i, field: f'values[{i}]')
+        lines.append("    __set(m, '__fields_set__', {n for n, v in zip(__names, values) if v is not None})")
+        if model.__private_attributes__:
+            lines.append('    m._init_private_attributes()')
+        lines.append('    return m')
+        self._lines += lines + ['']
+
+    def from_dict(self, values: dict[str, Any]) -> BaseModel:
+        product = self._from_dict(values)
+        if self.check:
+            self.verify(product)
+        return product
+
+    def from_tuple(self, values: Sequence[Any]) -> BaseModel:
+        # Values in field order, e.g. tuple(product.__dict__.values())
+        if len(values) != len(self.fields):
+            raise ValueError(f'expected {len(self.fields)} values, got {len(values)}')
+        product = self._from_tuple(values)
+        if self.check:
+            self.verify(product)
+        return product
+
+    __call__ = from_dict
+
+    def verify(self, product: BaseModel):
+        # Round-trips through the feed formatting so the validating path sees the raw strings it expects
+        from ..feed.writer import compile_plan, format_product
+
+        if self._plan is None:
+            self._plan = compile_plan(self.fields)
+        raw = {f: v for f, v in zip(self.fields, format_product(product, self._plan)) if v is not None}
+        try:
+            validated = self.model(**raw)
+        except ValidationError as e:
+            raise AssertionError(f'trusted {self.model.__name__} {product.__dict__.get("id")!r} does not pass validation: {e}') from e
+        mismatched = [f for f in self.fields if product.__dict__[f] != validated.__dict__[f]]
+        if mismatched:
+            raise AssertionError(f'trusted {self.model.__name__} {product.__dict__.get("id")!r} differs from validation in: {", ".join(mismatched)}')
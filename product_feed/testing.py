@@ -0,0 +1,118 @@
+"""Faker built feed rows, shared by the tests and the benchmarks.
+
+Each builder returns the raw attribute values of one product as a dict, and
+`make_row(f, typical_row, price='2.99 TWD')` one with some of them replaced. Faker is a development dependency, so
+this module only refers to it for type checking.
+"""
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+def base_row(f: 'Faker') -> dict:
+    return {
+        'id': '1',
+        'title': f.word(),
+        'description': f.sentence(),
+        'link': f.url(),
+        'image_link': f.image_url(),
+        'price': '1.99 TWD',
+        'availability': 'in stock',
+    }
+
+def typical_row(f: 'Faker') -> dict:
+    return {
+        **base_row(f),
+        'sale_price': '1.49 TWD',
+        'google_product_category': 'Apparel & Accessories > Clothing > Shirts & Tops',
+        'product_type': 'Shirts,Tops & Blouses',
+        'brand': f.company(),
+        'gtin': '3234567890126',
+        'mpn': f.bothify('??#####??').upper(),
+        'condition': 'new',
+        'age_group': 'adult',
+        'color': f.color_name(),
+        'gender': 'unisex',
+        'size': f.random_element(['S', 'M', 'L', 'XL']),
+        'item_group_id': f.bothify('G#####'),
+        'shipping': 'US::Fedex:1.99 USD',
+        'tax': 'US:CA:5.0:yes',
+    }
+
+def full_row(f: 'Faker') -> dict:
+    return {
+        'id': '2',
+        'title': f.word(),
+        'description': f.sentence(),
+        'link': f.url(),
+        'image_link': f.image_url(),
+        'additional_image_link': ','.join([f.image_url() for _ in range(10)]),
+        'mobile_link': f.url(),
+        'availability': 'in stock',
+        'availability_date': f.date_time().strftime('%Y-%m-%dT%H:%M%z'),
+        'cost_of_goods_sold': '0.99 TWD',
+        'expiration_date': f.date_time().strftime('%Y-%m-%dT%H:%M%z'),
+        'price': '1.99 TWD',
+        'sale_price': '1.49 TWD',
+        'sale_price_effective_date': f'{f.date_time().strftime("%Y-%m-%dT%H:%M%z")}/{f.date_time().strftime("%Y-%m-%dT%H:%M%z")}',
+        'unit_pricing_measure': 'g',
+        'unit_pricing_base_measure': '4g',
+        'installment': '3:0.5 TWD',
+        'subscription_cost': 'month:12:0.99 TWD',
+        'loyalty_points': 'Plan A:100:0.1',
+        'google_product_category': 'Apparel & Accessories > Clothing > Shirts & Tops',
+        'product_type': 'Shirts,Tops & Blouses,Blouses & Button-Down Shirts',
+        'brand': 'Google',
+        'gtin': '3234567890126',
+        'mpn': 'GO12345OOGLE',
+        'identifier_exists': 'no',
+        'condition': 'new',
+        'adult': 'yes',
+        'multipack': 6,
+        'is_bundle': 'yes',
+        'energy_efficiency_class': 'A++',
+        'min_energy_efficiency_class': 'A',
+        'max_energy_efficiency_class': 'A+++',
+        'age_group': 'kids',
+        'color': 'red/pink',
+        'gender': 'unisex',
+        'material': 'leather',
+        'pattern': 'striped',
+        'size': 'S',
+        'size_type': 'regular,petite',
+        'size_system': 'US',
+        'item_group_id': '123456',
+        'product_length': '20 in',
+        'product_width': '20 cm',
+        'product_height': '20 in',
+        'product_weight': '3.5 lbs',
+        'product_detail': 'General:Product Type:Digital player,General:Digital Player Type:Flash based,Display:Resolution:432 x 240,Display:Diagonal Size:2.5"',
+        'product_hightlight': 'Supports thousands of apps',
+        'ads_redirect': f.url(),
+        'custom_label_0': 'Seasonal',
+        'custom_label_1': 'Clearance',
+        'custom_label_2': 'Holiday',
+        'custom_label_3': 'Sale',
+        'custom_label_4': 'Price range',
+        'promotion_id': 'ABC123',
+        'excluded_destination': 'Shopping_ads,Buy_on_Google_listings',
+        'included_destination': 'Display_ads,Local_inventory_ads',
+        'shopping_ads_excluded_country': 'US,DE',
+        'pause': 'ads',
+        'shipping': 'US::Fedex:1.99 USD',
+        'shipping_label': 'Only Fedex',
+        'shipping_weight': '3.5 kg',
+        'shipping_length': '20.5 in',
+        'shipping_width': '20 cm',
+        'shipping_height': '20.5 in',
+        'ships_from_country': 'US',
+        'transit_time_label': '3-5 days',
+        'max_handling_time': 3,
+        'min_handling_time': 1,
+        'tax': 'US:CA:5.0:yes',
+        'tax_category': 'Clothing & Accessories',
+    }
+
+def make_row(f: 'Faker', builder: Callable[['Faker'], dict] = base_row, /, **overrides: Any) -> dict:
+    # Positional only, so no attribute name is taken by the parameters
+    return {**builder(f), **overrides}
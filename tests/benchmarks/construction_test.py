@@ -0,0 +1,20 @@
+from benchmarks.construction import compare, generate, run
+
+class TestConstructionBenchmark:
+    def test_generate(self):
+        rows = list(generate('typical', 5))
+        assert [r['id'] for r in rows] == ['0', '1', '2', '3', '4']
+        assert rows == list(generate('typical', 5))
+
+    def test_run(self):
+        result = run('minimal', 20)
+        assert result['rows'] == 20
+        assert result['rows_per_second'] > 0
+        assert result['peak_memory'] > 0
+        assert 'price' in result['field_us']
+
+    def test_compare(self):
+        baseline = {'results': {'minimal-10': {'rows_per_second': 1000.0}}}
+        assert compare(baseline, {'minimal-10': {'rows_per_second': 850.0}}, 0.2) == []
+        assert len(compare(baseline, {'minimal-10': {'rows_per_second': 700.0}}, 0.2)) == 1
+        assert compare(baseline, {'full-10': {'rows_per_second': 1.0}}, 0.2) == []
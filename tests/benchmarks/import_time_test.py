@@ -0,0 +1,8 @@
+from benchmarks.import_time import measure
+
+class TestImportTimeBenchmark:
+    def test_measure(self):
+        result = measure('product_feed.model.google', runs=1)
+        assert result['median_ms'] > 0
+        # Tables, date parsing and the catalog load on first use, not on import
+        assert result['loaded'] == []
@@ -0,0 +1,81 @@
+from faker import Faker
+
+from product_feed.feed import batch
+from product_feed.feed.batch import check_enum, check_gtin, check_length, validate_batch, validate_columns
+from product_feed.feed.prescreen import prescreen
+from product_feed.feed.reader import validate_row
+from product_feed.model.google import Availability, Product
+from product_feed.model.lazy import LazyProduct
+from product_feed.testing import full_row, make_row, typical_row
+
+f = Faker()
+
+class TestBatch:
+    def test_check_length(self):
+        assert list(check_length(['a', '', 'abcd'], 3)) == [True, True, False]
+        assert list(check_length(['a', '', 'abcd'], 3, required=True)) == [True, False, False]
+
+    def test_check_enum(self):
+        assert list(check_enum(['in stock', '', 'sold'], Availability)) == [True, True, False]
+        assert list(check_enum(['in stock', '', 'sold'], Availability, required=True)) == [True, False, False]
+
+    def test_check_gtin(self):
+        column = ['3234567890126', '3234567890127', '', '96385074', '0-36000-29145-2', 'abc', '²234567890126', '1' * 18]
+        expected = [True, False, True, True, True, False, False, False]
+        assert list(check_gtin(column)) == expected
+        assert list(check_gtin(column, required=True)) == expected[:2] + [False] + expected[3:]
+
+    def test_check_gtin_without_numpy(self, monkeypatch):
+        column = ['3234567890126', '3234567890127', '', '96385074', '²234567890126']
+        with_numpy = list(check_gtin(column))
+        monkeypatch.setattr(batch, 'np', None)
+        assert check_gtin(column) == with_numpy
+
+    def test_validate_columns(self):
+        result = validate_columns({
+            'id': ['1', 'x' * 51, ''],
+            'availability': ['in stock', 'preorder', 'sold'],
+        }, 3)
+
+        assert list(result.valid) == [True, False, False]
+        assert [e.loc_tuple() for e in result.errors[1]] == [('id',)]
+        assert [e.loc_tuple() for e in result.errors[2]] == [('id',), ('availability',)]
+
+    def test_validate_batch(self):
+        def row(i, **kwargs):
+            return i, make_row(f, id=str(i), **kwargs)
+
+        results = validate_batch([
+            row(1), row(2, title='x' * 151), row(3, condition='broken'), row(4, price='1.99'), row(5, gtin='3234567890127'),
+        ])
+
+        assert results[0].product.id == '1'
+        assert results[1].error.errors()[0]['loc'] == ('title',)
+        assert results[2].error.errors()[0]['loc'] == ('condition',)
+        assert results[3].error.errors()[0]['loc'] == ('price',)
+        assert results[4].error.errors()[0]['msg'] == 'gtin has an invalid check digit'
+
+    def test_same_as_validate_row(self):
+        raws = [
+            {k: str(v) for k, v in raw.items()}
+            for raw in (typical_row(f), full_row(f), make_row(f, typical_row, gtin='3-234567-890126', condition='used'))
+        ]
+        rows = [(i, raw) for i, raw in enumerate(raws)]
+        for model in (Product, LazyProduct):
+            for result, (line, raw) in zip(validate_batch(rows, model), rows):
+                expected = validate_row(model, line, raw).product
+                assert type(result.product) is model
+                assert result.product == expected
+                assert result.product.__fields_set__ == expected.__fields_set__
+                assert list(result.product.__dict__) == list(expected.__dict__)
+
+        # An unchecked field still fails as it does in the model
+        [result] = validate_batch([(1, {**raws[0], 'price': '1.99'})])
+        assert result.error.errors() == validate_row(Product, 1, {**raws[0], 'price': '1.99'}).error.errors()
+
+    def test_same_reasons_as_prescreen(self):
+        raw = {k: str(v) for k, v in typical_row(f).items()}
+        for field, value in [('title', 'x' * 151), ('condition', 'broken'), ('gtin', '3234567890127'), ('custom_label_0', 'x' * 101)]:
+            [result] = validate_batch([(1, {**raw, field: value})])
+            rejection = prescreen({**raw, field: value})
+            assert result.error.errors() == rejection.to_error().errors()
@@ -0,0 +1,142 @@
+from faker import Faker
+import pytest
+
+from product_feed.feed import FeedReader, ValidationCache
+from product_feed.feed.cache import row_hash
+from product_feed.model.lazy import LazyProduct
+from product_feed.testing import full_row, make_row, typical_row
+
+f = Faker()
+
+def rows(*raws):
+    return [(i + 2, {k: str(v) for k, v in raw.items()}) for i, raw in enumerate(raws)]
+
+class TestValidationCache:
+    def test_round_trip(self, tmp_path):
+        raws = rows(full_row(f), typical_row(f), make_row(f, typical_row, id='3', price='1.99'))
+
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            first = list(cache.validate(raws))
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.stored) == (0, 3, 3)
+
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            second = list(cache.validate(raws))
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.generation) == (3, 0, 2)
+        assert cache.stats.hit_rate == 1.0
+
+        for a, b in zip(first, second):
+            assert a.line == b.line
+            assert a.product == b.product
+            assert (a.error is None) == (b.error is None)
+        assert second[2].error.errors() == first[2].error.errors()
+
+    def test_changed_rows(self, tmp_path):
+        raws = rows(typical_row(f), make_row(f, typical_row, id='2'))
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            list(cache.validate(raws))
+
+        raws[1][1]['title'] = 'changed'
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            result = list(cache.validate(raws))
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert result[1].product.title == 'changed'
+
+    def test_duplicates_in_batch(self, tmp_path):
+        raw = typical_row(f)
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            result = list(cache.validate(rows(raw, raw, raw)))
+            assert len(cache) == 1
+        assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+        assert [r.line for r in result] == [2, 3, 4]
+
+    def test_eviction(self, tmp_path):
+        a, b = typical_row(f), make_row(f, typical_row, id='2')
+        with ValidationCache(tmp_path / 'cache.db', max_age=1) as cache:
+            list(cache.validate(rows(a, b)))
+        with ValidationCache(tmp_path / 'cache.db', max_age=1) as cache:
+            list(cache.validate(rows(a)))
+        assert cache.stats.evicted == 1
+
+        with ValidationCache(tmp_path / 'cache.db', max_age=1) as cache:
+            list(cache.validate(rows(a, b)))
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_failed_run_evicts_nothing(self, tmp_path):
+        a, b = typical_row(f), make_row(f, typical_row, id='2')
+        with ValidationCache(tmp_path / 'cache.db', max_age=1) as cache:
+            list(cache.validate(rows(a, b)))
+        with pytest.raises(RuntimeError):
+            with ValidationCache(tmp_path / 'cache.db', max_age=1) as cache:
+                next(cache.validate(rows(a)))
+                raise RuntimeError
+        assert cache.stats.evicted == 0
+
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            assert len(cache) == 2
+
+    def test_version(self, tmp_path):
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            list(cache.validate(rows(typical_row(f))))
+        with ValidationCache(tmp_path / 'cache.db', version='2') as cache:
+            assert len(cache) == 0
+
+    def test_lazy_product(self, tmp_path):
+        with ValidationCache(tmp_path / 'cache.db', model=LazyProduct) as cache:
+            [row] = list(cache.validate(rows(full_row(f))))
+        # Pending fields are not validated just to fill the cache
+        assert row.product.pending
+        assert cache.stats.stored == 0
+
+    def test_feed_reader(self, tmp_path):
+        path = tmp_path / 'feed.tsv'
+        path.write_text(
+            'id\ttitle\tdescription\tlink\timage link\tprice\tavailability\n'
+            f'1\t{f.word()}\t{f.sentence()}\t{f.url()}\t{f.image_url()}\t1.99 TWD\tin stock\n'
+            f'2\t{f.word()}\t{f.sentence()}\t{f.url()}\t{f.image_url()}\t1.99\tin stock\n'
+        )
+        expected = list(FeedReader(path))
+        for _ in range(2):
+            with ValidationCache(tmp_path / 'cache.db') as cache:
+                assert [(r.line, r.product) for r in FeedReader(path, cache=cache)] == [(r.line, r.product) for r in expected]
+        assert cache.stats.hits == 2
+
+        with pytest.raises(ValueError):
+            FeedReader(path, model=LazyProduct, cache=cache)
+
+    def test_prescreen(self, tmp_path):
+        path = tmp_path / 'feed.tsv'
+        path.write_text(
+            'id\ttitle\tdescription\tlink\timage link\tprice\tavailability\n'
+            f'1\t{f.word()}\t{f.sentence()}\t{f.url()}\t{f.image_url()}\t1.99 TWD\tin stock\n'
+            f'2\t{f.word()}\t{f.sentence()}\t{f.url()}\t{f.image_url()}\t1.99\tin stock\n'
+        )
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            result = list(FeedReader(path, cache=cache, prescreen=True))
+        assert [str(r.error) for r in result] == [str(r.error) for r in FeedReader(path, prescreen=True)]
+        # The pre-screen rejection is not stored
+        assert cache.stats.stored == 1
+
+        # So a run without the pre-screen gets the model's own error
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            result = list(FeedReader(path, cache=cache))
+        assert [str(r.error) for r in result] == [str(r.error) for r in FeedReader(path)]
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_row_hash(self):
+        raw = {k: str(v) for k, v in typical_row(f).items()}
+        assert row_hash(raw) == row_hash(dict(reversed(raw.items())))
+        assert row_hash(raw) != row_hash({**raw, 'title': raw['title'] + ' '})
+
+    def test_saved(self, tmp_path):
+        raws = rows(*(make_row(f, typical_row, id=str(i)) for i in range(20)))
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            list(cache.validate(raws))
+        assert cache.stats.saved == 0.0
+        cost = cache.stats.validate_cost
+        assert cost > 0
+
+        # Without a single miss the estimate falls back to the previous run's cost
+        with ValidationCache(tmp_path / 'cache.db') as cache:
+            list(cache.validate(raws))
+        assert cache.stats.validate_cost == cost
+        assert cache.stats.saved == 20 * cost - cache.stats.hit_time
@@ -0,0 +1,71 @@
+from faker import Faker
+import pytest
+
+from product_feed.feed.delta import ChangedFields, ChangeType, DeltaEngine, DeltaState, changed_fields, fingerprint
+from product_feed.model import GoogleProduct
+from product_feed.testing import make_row
+
+f = Faker()
+
+def product(id, **kwargs):
+    # The same seed every time, so a product only changes where a test overrides it
+    f.seed_instance(0)
+    return GoogleProduct(**make_row(f, id=id, **kwargs))
+
+class TestDeltaEngine:
+    def test_diff(self, tmp_path):
+        engine = DeltaEngine()
+        assert [c.type for c in engine.diff([product('1'), product('2'), product('3'), product('4')])] == [ChangeType.INSERT] * 4
+
+        path = tmp_path / 'state.bin'
+        engine.state.save(path)
+        engine = DeltaEngine(DeltaState.load(path))
+
+        changes = list(engine.diff([
+            product('1'),
+            product('2', price='2.99 TWD'),
+            product('3', availability='out of stock', title='Red shirt'),
+            product('5'),
+        ]))
+
+        assert [(c.type, c.id, c.fields) for c in changes] == [
+            (ChangeType.UPDATE, '2', ChangedFields.PRICE),
+            (ChangeType.UPDATE, '3', ChangedFields.AVAILABILITY | ChangedFields.OTHER),
+            (ChangeType.INSERT, '5', ChangedFields.PRICE | ChangedFields.AVAILABILITY | ChangedFields.OTHER),
+            (ChangeType.DELETE, '4', ChangedFields.NONE),
+        ]
+        assert set(engine.state) == {'1', '2', '3', '5'}
+
+    def test_fingerprint_is_stable(self):
+        a = product('1', shipping='US::Fedex:1.99 USD', sale_price_effective_date='2022-10-01T13:00+0800/2022-10-31T13:00+0800')
+        b = product('1', shipping='US::Fedex:1.99 USD', sale_price_effective_date='2022-10-01T13:00+0800/2022-10-31T13:00+0800')
+        assert fingerprint(a) == fingerprint(b)
+        assert len(fingerprint(a)) == 24
+
+    def test_fingerprint_is_canonical(self):
+        # The fast date path gives a timezone, dateutil a tzoffset for the same offset
+        fast = product('1', availability_date='2022-10-01T13:00+0800')
+        fallback = product('1', availability_date='2022-10-01 13:00 +08:00')
+        assert type(fast.availability_date.tzinfo) is not type(fallback.availability_date.tzinfo)
+        assert fingerprint(fast) == fingerprint(fallback)
+
+        # Missing and empty differ, and a list the writer cannot flatten still fingerprints
+        assert fingerprint(product('1', brand='')) != fingerprint(product('1'))
+        gtins = product('1').copy(update={'gtin': ['3234567890126', '96385074']})
+        assert changed_fields(fingerprint(product('1')), fingerprint(gtins)) == ChangedFields.OTHER
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / 'state.bin'
+        path.write_bytes(b'not a delta state')
+        with pytest.raises(ValueError):
+            DeltaState.load(path)
+
+        state = DeltaState({'1': fingerprint(product('1')), '2': fingerprint(product('2'))})
+        state.save(path)
+        assert DeltaState.load(path) == state
+        data = path.read_bytes()
+        # Cut inside the last fingerprint, before it, inside the last id and inside its length prefix
+        for end in (len(data) - 1, len(data) - 24, len(data) - 25, len(data) - 26):
+            path.write_bytes(data[:end])
+            with pytest.raises(ValueError):
+                DeltaState.load(path)
@@ -0,0 +1,27 @@
+from faker import Faker
+
+from product_feed.feed import ParallelValidator
+from product_feed.testing import make_row
+
+f = Faker()
+
+class TestParallelValidator:
+    def test_order_and_errors(self):
+        rows = []
+        for i in range(50):
+            rows.append((i + 2, make_row(f, id=str(i), price='1.99 TWD' if i % 7 else '1.99')))
+
+        validator = ParallelValidator(workers=2, chunk_size=8)
+        results = list(validator.validate(rows))
+
+        assert [r.line for r in results] == [line for line, _ in rows]
+        for i, r in enumerate(results):
+            if i % 7:
+                assert r.product.id == str(i)
+            else:
+                assert r.product is None
+                assert r.error is not None
+
+        assert validator.stats.rows == 50
+        assert validator.stats.errors == 8
+        assert validator.stats.rows_per_second > 0
@@ -0,0 +1,71 @@
+from time import perf_counter
+import asyncio
+
+from faker import Faker
+import pytest
+
+from product_feed.feed.pipeline import Pipeline, iterate_in_executor
+from product_feed.testing import make_row
+
+f = Faker()
+
+def rows(prefix, n):
+    for i in range(n):
+        yield i + 2, make_row(f, id=f'{prefix}{i}', price='1.99 TWD' if i % 5 else '1.99')
+
+class TestPipeline:
+    def test_run(self):
+        fast, slow = [], []
+
+        async def fast_sink(row):
+            fast.append(row)
+
+        async def slow_sink(row):
+            await asyncio.sleep(0.001)
+            slow.append(row)
+
+        pipeline = Pipeline(
+            [iterate_in_executor(rows('a', 30)), iterate_in_executor(rows('b', 20))],
+            {'fast': fast_sink, 'slow': slow_sink},
+            validation_workers=2,
+            queue_size=4,
+        )
+        stats = asyncio.run(pipeline.run())
+
+        assert len(fast) == len(slow) == 50
+        assert sum(1 for r in fast if r.error) == 10
+        assert {r.product.id for r in slow if r.product} == {f'a{i}' for i in range(30) if i % 5} | {f'b{i}' for i in range(20) if i % 5}
+        assert stats['validate'].count == 50
+        assert stats['sink:slow'].mean > 0
+        assert max(pipeline.max_queue_depths().values()) <= 4
+
+    def test_sink_error(self):
+        async def sink(row):
+            raise RuntimeError('sink failed')
+
+        pipeline = Pipeline([iterate_in_executor(rows('a', 100))], {'broken': sink}, queue_size=2)
+        with pytest.raises(RuntimeError, match='sink failed'):
+            asyncio.run(pipeline.run())
+
+    @pytest.mark.parametrize('fail_at', [25, 28])
+    def test_late_sink_error(self, fail_at):
+        calls = 0
+
+        async def sink(row):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.005)
+            if calls == fail_at:
+                raise RuntimeError('sink failed')
+
+        # run() is left putting sentinels on a full queue when the sink fails
+        pipeline = Pipeline([iterate_in_executor(rows('a', 30))], {'broken': sink}, validation_workers=1, queue_size=2)
+
+        async def run():
+            return await asyncio.wait_for(pipeline.run(), 2)
+
+        start = perf_counter()
+        with pytest.raises(RuntimeError, match='sink failed'):
+            asyncio.run(run())
+        # Raised as the sink fails, not once wait_for gives up on a hung run()
+        assert perf_counter() - start < 1
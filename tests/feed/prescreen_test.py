@@ -0,0 +1,53 @@
+import io
+
+from faker import Faker
+
+from product_feed.feed import FeedReader
+from product_feed.feed.prescreen import Rejection, prescreen
+from product_feed.model import GoogleProduct
+from product_feed.model.google import Unit
+from product_feed.testing import make_row
+
+f = Faker()
+
+class TestPrescreen:
+    def test_valid(self):
+        data = make_row(f, condition='new', sale_price='1.49 TWD', brand='Google')
+        assert prescreen(data) is None
+        assert GoogleProduct(**data)
+
+    def test_normalised_by_validators(self):
+        # Accepted by Product, so the pre-screen must let them through
+        for data, field, value in [
+            (make_row(f, unit_pricing_measure='KG'), 'unit_pricing_measure', Unit.KG),
+            (make_row(f, unit_pricing_measure='lbs'), 'unit_pricing_measure', Unit.LB),
+            (make_row(f, link=' https://example.com'), 'link', 'https://example.com'),
+        ]:
+            assert prescreen(data) is None
+            assert getattr(GoogleProduct(**data), field) == value
+
+    def test_rejections(self):
+        data = make_row(f)
+        del data['title']
+        assert prescreen(data) == Rejection('title', 'title is required')
+        assert prescreen(make_row(f, id='x' * 51)).field == 'id'
+        assert prescreen(make_row(f, price='1.99')).field == 'price'
+        assert prescreen(make_row(f, price='1.99 XYZ')).field == 'price'
+        assert prescreen(make_row(f, sale_price='abc TWD')).field == 'sale_price'
+        assert prescreen(make_row(f, availability='sold')).field == 'availability'
+        assert prescreen(make_row(f, link='example.com')).field == 'link'
+        assert prescreen(make_row(f, gtin='3234567890127')) == Rejection('gtin', 'gtin has an invalid check digit')
+        assert prescreen(make_row(f, gtin='323456')) == Rejection('gtin', 'gtin must be 8, 12, 13, or 14 digits')
+        assert prescreen(make_row(f, gtin='3-234567-890126')) is None
+
+    def test_reader(self):
+        source = io.StringIO(
+            'id,title,description,link,image_link,price,availability\n'
+            f'1,{f.word()},{f.sentence()},{f.url()},{f.image_url()},1.99 TWD,in stock\n'
+            f'2,{f.word()},{f.sentence()},{f.url()},{f.image_url()},1.99 TWD,sold\n'
+        )
+
+        rows = list(FeedReader(source, prescreen=True))
+        assert rows[0].product.id == '1'
+        assert rows[1].error.errors()[0]['loc'] == ('availability',)
+        assert rows[1].error.errors()[0]['type'] == 'assertion_error'
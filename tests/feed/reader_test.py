@@ -0,0 +1,61 @@
+from decimal import Decimal
+import io
+
+from faker import Faker
+from iso4217 import Currency
+
+from product_feed.feed import FeedReader
+from product_feed.feed.reader import compile_header
+from product_feed.model.google import Availability
+
+f = Faker()
+
+class TestFeedReader:
+    def test_csv(self, tmp_path):
+        path = tmp_path / 'feed.csv'
+        path.write_text(
+            'id,title,description,link,image link,price,availability,shipping,unknown\n'
+            f'1,{f.word()},{f.sentence()},{f.url()},{f.image_url()},1.99 TWD,in stock,"US::Fedex:1.99 USD,DE::DHL:2.50 EUR",x\n'
+            f'2,{f.word()},{f.sentence()},{f.url()},{f.image_url()},1.99,in stock,,\n'
+        )
+
+        rows = list(FeedReader(path))
+        assert len(rows) == 2
+
+        assert rows[0].error is None
+        assert rows[0].product.id == '1'
+        assert rows[0].product.price == (Decimal('1.99'), Currency.twd)
+        assert rows[0].product.availability == Availability.IN_STOCK
+        assert len(rows[0].product.shipping) == 2
+
+        assert rows[1].product is None
+        assert rows[1].line == 3
+        assert rows[1].error.errors()[0]['loc'] == ('price',)
+
+    def test_tsv(self):
+        source = io.StringIO(
+            'g:id\tg:title\tg:description\tg:link\tg:image_link\tg:price\tg:availability\tg:brand\n'
+            f'1\t{f.word()}\t{f.sentence()}\t{f.url()}\t{f.image_url()}\t1.99 TWD\tpreorder\t\n'
+        )
+
+        rows = list(FeedReader(source))
+        assert rows[0].error is None
+        assert rows[0].product.availability == Availability.PREORDER
+        assert rows[0].product.brand is None
+
+    def test_unknown_country(self):
+        source = io.StringIO(
+            'id,title,description,link,image_link,price,availability,ships_from_country\n'
+            f'1,{f.word()},{f.sentence()},{f.url()},{f.image_url()},1.99 TWD,in stock,XX\n'
+        )
+
+        rows = list(FeedReader(source))
+        assert rows[0].product is None
+        assert rows[0].error is not None
+
+    def test_compile_header(self):
+        assert compile_header(['ID', 'Image Link', 'product highlight', 'foo']) == [
+            (0, 'id'),
+            (1, 'image_link'),
+            (2, 'product_hightlight'),
+        ]
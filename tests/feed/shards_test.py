@@ -0,0 +1,62 @@
+from xml.etree import ElementTree
+import gzip
+import json
+import os
+
+from faker import Faker
+import pytest
+
+from product_feed.feed import FeedReader, ShardedWriter
+from product_feed.feed.writer import RssWriter
+from product_feed.model import GoogleProduct
+from product_feed.testing import full_row, make_row
+
+f = Faker()
+
+class TestShardedWriter:
+    products = [GoogleProduct(**make_row(f, full_row, id=str(i))) for i in range(10)]
+
+    def test_max_rows(self, tmp_path):
+        with ShardedWriter(tmp_path, max_rows=4, workers=2) as writer:
+            writer.write_all(self.products)
+
+        manifest = json.loads((tmp_path / 'feed-manifest.json').read_text())
+        assert manifest['rows'] == 10
+        assert [s['file'] for s in manifest['shards']] == ['feed-00000.tsv.gz', 'feed-00001.tsv.gz', 'feed-00002.tsv.gz']
+        assert [s['rows'] for s in manifest['shards']] == [4, 4, 2]
+
+        products = []
+        for shard in manifest['shards']:
+            path = tmp_path / shard['file']
+            assert os.path.getsize(path) == shard['compressed_bytes']
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as source:
+                products += [row.product for row in FeedReader(source)]
+        assert products == self.products
+
+    def test_max_bytes(self, tmp_path):
+        writer = ShardedWriter(tmp_path, prefix='capped', max_bytes=4096)
+        writer.write_all(self.products)
+        manifest = writer.close()
+
+        assert sum(s['rows'] for s in manifest['shards']) == 10
+        assert len(manifest['shards']) > 1
+        for shard in manifest['shards']:
+            size = len(gzip.decompress((tmp_path / shard['file']).read_bytes()))
+            assert size == shard['bytes']
+            assert size <= 4096 or shard['rows'] == 1
+
+    def test_rss_shards(self, tmp_path):
+        writer = ShardedWriter(tmp_path, format=RssWriter, max_rows=6, title='Shop', link='https://example.com')
+        writer.write_all(self.products)
+        manifest = writer.close()
+
+        assert [s['file'] for s in manifest['shards']] == ['feed-00000.xml.gz', 'feed-00001.xml.gz']
+        root = ElementTree.fromstring(gzip.decompress((tmp_path / 'feed-00001.xml.gz').read_bytes()))
+        assert len(root.findall('channel/item')) == 4
+
+    def test_failed_export(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            with ShardedWriter(tmp_path, max_rows=4) as writer:
+                writer.write_all(self.products)
+                raise RuntimeError
+        assert not (tmp_path / 'feed-manifest.json').exists()
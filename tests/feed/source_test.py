@@ -0,0 +1,59 @@
+import bz2
+import gzip
+import io
+import lzma
+
+from faker import Faker
+import pytest
+
+from product_feed.feed import FeedReader, FeedSource
+from product_feed.feed.source import detect_codec
+from product_feed.testing import base_row, make_row
+
+f = Faker()
+
+def feed(rows: int) -> bytes:
+    header = list(base_row(f))
+    lines = ['\t'.join(header)]
+    for i in range(rows):
+        lines.append('\t'.join(make_row(f, id=str(i))[h] for h in header))
+    return ('\n'.join(lines) + '\n').encode()
+
+class TestFeedSource:
+    data = feed(50)
+
+    def test_detect_codec(self):
+        assert detect_codec(gzip.compress(b'x')) == 'gzip'
+        assert detect_codec(bz2.compress(b'x')) == 'bz2'
+        assert detect_codec(lzma.compress(b'x')) == 'xz'
+        assert detect_codec(b'id\ttitle') is None
+
+    @pytest.mark.parametrize('codec, compress', [
+        (None, lambda b: b),
+        ('gzip', gzip.compress),
+        ('bz2', bz2.compress),
+        ('xz', lzma.compress),
+    ])
+    def test_read(self, tmp_path, codec, compress):
+        path = tmp_path / 'feed'
+        path.write_bytes(compress(self.data))
+
+        reader = FeedReader(path, chunk_size=4096)
+        rows = list(reader)
+        assert [row.product.id for row in rows] == [str(i) for i in range(50)]
+
+        stats = reader.source.stats
+        assert stats.codec == codec
+        assert stats.bytes == len(self.data)
+        assert stats.compressed_bytes == path.stat().st_size
+        assert stats.ratio == pytest.approx(len(self.data) / path.stat().st_size)
+        assert stats.bytes_per_second > 0
+
+    def test_binary_stream(self):
+        stream = io.BytesIO(gzip.compress(self.data))
+        source = FeedSource(stream)
+        with source.open() as text:
+            assert text.readline().startswith('id\t')
+        # Streams handed in by the caller are left open
+        assert not stream.closed
+        assert source.stats.codec == 'gzip'
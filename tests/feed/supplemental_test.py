@@ -0,0 +1,66 @@
+from decimal import Decimal
+import io
+
+from faker import Faker
+from iso4217 import Currency
+from pydantic import ValidationError
+import pytest
+
+from product_feed.feed import FeedReader, SupplementalMerger
+from product_feed.model.catalog import Catalog
+from product_feed.model.google import Availability, Product
+from product_feed.testing import make_row
+
+f = Faker()
+
+class TestSupplementalMerger:
+    def catalog(self) -> Catalog:
+        return Catalog(Product(**make_row(f, id=str(i), brand='Google')) for i in range(3))
+
+    def test_validate(self):
+        merger = SupplementalMerger(self.catalog())
+        assert merger.validate({'price': '2.50 USD', 'availability': 'out of stock', 'title': 'ignored'}) == {
+            'price': (Decimal('2.50'), Currency.usd),
+            'availability': Availability.OUT_OF_STOCK,
+        }
+        with pytest.raises(ValidationError) as e:
+            merger.validate({'price': '2.50', 'sale_price': 'abc USD'})
+        assert [err['loc'] for err in e.value.errors()] == [('price',), ('sale_price',)]
+
+    def test_apply(self):
+        catalog = self.catalog()
+        original = catalog['2'].price
+        source = io.StringIO(
+            'id\tprice\tsale_price\tavailability\n'
+            '1\t2.50 USD\t2.00 USD\tout of stock\n'
+            '2\t2.50\t\t\n'
+            '9\t1.00 USD\t\t\n'
+        )
+        merger = SupplementalMerger(catalog)
+        rows = list(merger.apply(FeedReader(source).rows()))
+
+        assert rows[0].product is catalog['1']
+        assert catalog['1'].price == (Decimal('2.50'), Currency.usd)
+        assert catalog['1'].sale_price == (Decimal('2.00'), Currency.usd)
+        assert catalog['1'].availability == Availability.OUT_OF_STOCK
+        assert catalog['1'].brand == 'Google'
+        assert rows[1].error.errors()[0]['loc'] == ('price',)
+        assert catalog['2'].price == original
+        assert rows[2].error.errors()[0]['loc'] == ('id',)
+
+        stats = merger.stats
+        assert (stats.rows, stats.updated, stats.unknown, stats.errors) == (3, 1, 1, 2)
+
+    def test_clear(self):
+        catalog = Catalog(Product(**make_row(f, id=str(i), sale_price='1.49 TWD')) for i in range(2))
+        source = io.StringIO(
+            'id\tprice\tsale_price\tavailability\n'
+            '0\t2.50 USD\t\tout of stock\n'
+            '1\t\t\tout of stock\n'
+        )
+        rows = list(SupplementalMerger(catalog).apply(FeedReader(source).rows(keep_empty=True)))
+
+        assert rows[0].error is None
+        assert catalog['0'].sale_price is None
+        assert rows[1].error.errors()[0]['loc'] == ('price',)
+        assert catalog['1'].sale_price == (Decimal('1.49'), Currency.twd)
@@ -0,0 +1,114 @@
+from xml.etree import ElementTree
+import io
+
+from faker import Faker
+import pytest
+
+from product_feed.feed import FeedReader
+from product_feed.feed.writer import FeedWriter, RssWriter, TsvWriter
+from product_feed.model import GoogleProduct
+from product_feed.model.google import Shipping
+
+f = Faker()
+
+class TestFeedWriter:
+    product = GoogleProduct(
+        id='2',
+        title='"Quoted" shirt',
+        description=f.sentence() + '\twith a tab',
+        link=f.url(),
+        image_link=f.image_url(),
+        additional_image_link=','.join([f.image_url() for _ in range(3)]),
+        availability='in stock',
+        availability_date='2022-10-01T13:00+0800',
+        cost_of_goods_sold='0.99 TWD',
+        price='1.99 TWD',
+        sale_price='1.49 TWD',
+        sale_price_effective_date='2022-10-01T13:00:59.25+0800/2022-10-31T13:00Z',
+        unit_pricing_measure='g',
+        unit_pricing_base_measure='4g',
+        installment='3:0.5 TWD',
+        subscription_cost='month:12:0.99 TWD',
+        loyalty_points='Plan A:100:0.1',
+        product_type='Shirts,Tops & Blouses',
+        brand='Google & Co <3>',
+        gtin='3234567890126',
+        identifier_exists='no',
+        condition='new',
+        adult='yes',
+        multipack=6,
+        energy_efficiency_class='A++',
+        age_group='kids',
+        color='red/pink',
+        gender='unisex',
+        size_type='regular,petite',
+        size_system='US',
+        product_length='20 in',
+        product_weight='3.5 lbs',
+        product_detail='General:Product Type:Digital player,Display:Resolution:432 x 240',
+        product_hightlight='Supports thousands of apps',
+        promotion_id='ABC123,DEF456',
+        excluded_destination='Shopping_ads,Buy_on_Google_listings',
+        shopping_ads_excluded_country='US,DE',
+        pause='ads',
+        shipping='US::Fedex:1.99 USD,DE:BE:DHL:2.50 EUR',
+        shipping_weight='3.5 kg',
+        ships_from_country='US',
+        max_handling_time=3,
+        tax='US:CA:5.0:yes',
+    )
+
+    def test_tsv_round_trip(self):
+        out = io.StringIO()
+        with TsvWriter(out, buffer_size=64) as writer:
+            writer.write_all([self.product, self.product.copy(update={'id': '3'})])
+
+        rows = list(FeedReader(io.StringIO(out.getvalue())))
+        assert len(rows) == 2
+        assert rows[0].error is None
+        assert rows[0].product == self.product.copy(update={'description': self.product.description.replace('\t', ' ')})
+        assert rows[1].product.id == '3'
+
+    def test_shipping_without_price(self):
+        product = self.product.copy(update={'shipping': [Shipping(country='US', service='Pickup')]})
+        out = io.StringIO()
+        with TsvWriter(out, fields=['id', 'title', 'description', 'link', 'image_link', 'price', 'availability', 'shipping']) as writer:
+            writer.write(product)
+        assert out.getvalue().splitlines()[1].endswith('\tUS::Pickup')
+
+        row = next(iter(FeedReader(io.StringIO(out.getvalue()))))
+        assert row.error is None
+        assert row.product.shipping == product.shipping
+
+    def test_close_twice(self, tmp_path):
+        path = tmp_path / 'feed.xml'
+        writer = RssWriter(path, title='Shop', link='https://example.com')
+        writer.write(self.product)
+        writer.close()
+        writer.close()
+        assert path.read_text(encoding='utf-8').count('</rss>') == 1
+
+    def test_list_fields(self):
+        # gtin and promotion_id hold the feed value as their only item
+        with pytest.raises(ValueError, match='promotion_id holds 2 values'):
+            TsvWriter(io.StringIO()).render(self.product.copy(update={'promotion_id': ['A', 'B']}))
+
+    def test_rss(self):
+        out = io.StringIO()
+        with RssWriter(out, title='Shop', link='https://example.com', fields=['id', 'price', 'brand', 'product_hightlight', 'mobile_link']) as writer:
+            writer.write(self.product)
+
+        root = ElementTree.fromstring(out.getvalue())
+        item = root.find('channel/item')
+        ns = {'g': 'http://base.google.com/ns/1.0'}
+        assert item.find('g:price', ns).text == '1.99 TWD'
+        assert item.find('g:brand', ns).text == 'Google & Co <3>'
+        assert item.find('g:product_highlight', ns).text == 'Supports thousands of apps'
+        assert item.find('g:mobile_link', ns) is None
+
+    def test_incomplete_writer(self):
+        class NoRender(FeedWriter):
+            pass
+
+        with pytest.raises(TypeError):
+            NoRender(io.StringIO())
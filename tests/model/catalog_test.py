@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from faker import Faker
+from iso4217 import Currency
+from pydantic import HttpUrl
+import pytest
+
+from product_feed.model import Catalog, CompactCatalog, GoogleProduct
+from product_feed.model.catalog import deep_sizeof
+from product_feed.model.google import Availability, LenUnit, WeightUnit
+from product_feed.model.lazy import LazyProduct
+from product_feed.testing import full_row, make_row
+
+f = Faker()
+
+def product(i, **kwargs):
+    return GoogleProduct(**make_row(f, id=str(i), price=f'{i}.99 TWD', **kwargs))
+
+class TestCompactCatalog:
+    products = [
+        product(1),
+        product(2, brand='Google', sale_price='1.49 USD', product_length='20.5 in', shipping_weight='3 kg', max_handling_time=3),
+        product(3, brand='Google', shipping='US::Fedex:1.99 USD', tax='US:CA:5.0:yes', color='red/pink'),
+    ]
+    catalog = CompactCatalog(products)
+
+    def test_round_trip(self):
+        assert len(self.catalog) == 3
+        for original, view in zip(self.products, self.catalog):
+            assert view == original
+
+        assert isinstance(self.catalog[0].link, HttpUrl)
+        assert self.catalog[1].price == (Decimal('2.99'), Currency.twd)
+        assert self.catalog[1].product_length == ('20.5', LenUnit.IN)
+        assert self.catalog[1].shipping_weight == ('3', WeightUnit.KG)
+        assert self.catalog[0].sale_price is None
+        assert self.catalog[-1].color == ['red', 'pink']
+
+    def test_lazy_product(self):
+        row = full_row(f)
+        view = CompactCatalog([LazyProduct(**row)])[0]
+        expected = GoogleProduct(**row)
+        assert view.shipping == expected.shipping
+        assert view.installment == expected.installment
+        assert view == expected
+
+    def test_value(self):
+        assert self.catalog.value(1, 'brand') == 'Google'
+        assert self.catalog.value(0, 'availability') == Availability.IN_STOCK
+        assert self.catalog.value(2, 'max_handling_time') is None
+        assert self.catalog.get('2').max_handling_time == 3
+        assert self.catalog.get('4') is None
+
+    def test_interned(self):
+        assert self.catalog._tables['brand'] == [None, 'Google']
+
+    def test_shared(self):
+        products = [product(i, shipping='US::Fedex:1.99 USD', tax=f'US:CA:{rate}:yes') for i, rate in enumerate(['5.0', '5.0', '5'])]
+        catalog = CompactCatalog(products)
+        assert len(catalog._tables['shipping']) == 2
+        assert [str(p.tax[0].rate) for p in catalog] == ['5.0', '5.0', '5']
+
+        view = catalog[0]
+        assert view.shipping == products[0].shipping
+        view.shipping.clear()
+        assert catalog[0].shipping == products[0].shipping
+
+    def test_bytes_per_product(self):
+        products = [product(i, brand='Google') for i in range(100)]
+        catalog = CompactCatalog(products)
+        assert 0 < catalog.bytes_per_product() < deep_sizeof(products) / len(products)
+
+        products = [GoogleProduct(**make_row(f, full_row, id=str(i))) for i in range(100)]
+        catalog = CompactCatalog(products)
+        assert catalog.bytes_per_product() < deep_sizeof(products) / len(products) / 2
+
+class TestCatalog:
+    def test_indexes(self):
+        catalog = Catalog([
+            product(1, brand='Google', item_group_id='G1', gtin='3234567890126'),
+            product(2, brand='Google', item_group_id='G1', google_product_category='Apparel'),
+            product(3, brand='Other', google_product_category='Apparel'),
+        ])
+
+        assert len(catalog) == 3
+        assert [p.id for p in catalog.variants('G1')] == ['1', '2']
+        assert [p.id for p in catalog.by_brand('Google')] == ['1', '2']
+        assert [p.id for p in catalog.by_category('Apparel')] == ['2', '3']
+        assert [p.id for p in catalog.by_gtin('3234567890126')] == ['1']
+        assert catalog.by_brand('Missing') == []
+
+    def test_replace_and_remove(self):
+        catalog = Catalog([product(1, brand='Google', item_group_id='G1'), product(2, brand='Google')])
+
+        replaced = catalog.add(product(1, brand='Other'))
+        assert replaced.brand == 'Google'
+        assert [p.id for p in catalog.by_brand('Google')] == ['2']
+        assert [p.id for p in catalog.by_brand('Other')] == ['1']
+        assert catalog.variants('G1') == []
+        assert 'G1' not in catalog._indexes['item_group_id']
+
+        assert catalog.remove('2').id == '2'
+        assert catalog.by_brand('Google') == []
+        assert '2' not in catalog
+
+    def test_update(self):
+        catalog = Catalog([product(1, brand='Google', item_group_id='G1'), product(2, brand='Google')])
+        stored = catalog['1']
+
+        assert catalog.update('1', {'brand': 'Other', 'title': 'Updated'}) is stored
+        assert stored.title == 'Updated'
+        assert [p.id for p in catalog.by_brand('Google')] == ['2']
+        assert [p.id for p in catalog.by_brand('Other')] == ['1']
+        assert [p.id for p in catalog.variants('G1')] == ['1']
+        assert catalog.update('3', {'title': 'Missing'}) is None
+        with pytest.raises(ValueError):
+            catalog.update('1', {'id': '3'})
+
+    def test_index_memory(self):
+        catalog = Catalog([product(i, brand=f'B{i % 10}') for i in range(100)])
+        memory = catalog.index_memory()
+        assert set(memory) == {'gtin', 'item_group_id', 'brand', 'google_product_category'}
+        assert memory['brand'] > memory['gtin']
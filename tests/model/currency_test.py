@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from faker import Faker
+from iso4217 import Currency
+import pytest
+
+from product_feed.model import Catalog, GoogleProduct
+from product_feed.model.currency import CurrencyConverter
+from product_feed.model.lazy import LazyProduct
+from product_feed.testing import full_row, make_row
+
+f = Faker()
+
+RATES = {Currency.twd: '0.0311', Currency.usd: '0.92'}
+
+class TestCurrencyConverter:
+    def test_convert(self):
+        product = GoogleProduct(**full_row(f))
+        converter = CurrencyConverter(RATES, Currency.eur)
+        [converted] = converter.convert([product])
+
+        assert converted.price == (Decimal('0.06'), Currency.eur)
+        assert converted.sale_price == (Decimal('0.05'), Currency.eur)
+        assert converted.cost_of_goods_sold == (Decimal('0.03'), Currency.eur)
+        assert converted.installment.months == 3
+        assert converted.installment.amount == (Decimal('0.02'), Currency.eur)
+        assert converted.subscription_cost.amount == (Decimal('0.03'), Currency.eur)
+        assert converted.shipping[0].price == (Decimal('1.83'), Currency.eur)
+        assert converted.shipping[0].country == product.shipping[0].country
+        assert converted.title == product.title
+
+        # The original is left as it was
+        assert product.price == (Decimal('1.99'), Currency.twd)
+        assert product.shipping[0].price == (Decimal('1.99'), Currency.usd)
+
+    def test_rounding(self):
+        products = [GoogleProduct(**make_row(f, price='12.34 USD'))]
+        assert CurrencyConverter({Currency.usd: '150.5'}, Currency.jpy).convert(products)[0].price == (Decimal('1857'), Currency.jpy)
+        assert CurrencyConverter({Currency.usd: '0.377'}, Currency.bhd).convert(products)[0].price == (Decimal('4.652'), Currency.bhd)
+
+    def test_target_currency(self):
+        product = GoogleProduct(**make_row(f, price='1.999 EUR'))
+        [converted] = CurrencyConverter(RATES, Currency.eur).convert([product])
+        assert converted.price == (Decimal('1.999'), Currency.eur)
+
+    def test_missing_rate(self):
+        product = GoogleProduct(**make_row(f, price='1.99 GBP'))
+        with pytest.raises(ValueError, match='no GBP to EUR rate'):
+            CurrencyConverter(RATES, Currency.eur).convert([product])
+
+    def test_shared_amounts(self):
+        row = make_row(f, shipping='US::Fedex:1.99 USD')
+        products = [GoogleProduct(**{**row, 'id': str(i), 'price': f'{i % 3}.99 TWD'}) for i in range(9)]
+        converter = CurrencyConverter(RATES, Currency.eur)
+        converted = converter.convert(products)
+
+        assert converter.stats.products == 9
+        assert converter.stats.amounts == 18
+        assert converter.stats.distinct == 4
+        assert converter.stats.currencies == 2
+        # Interned Shipping entries stay shared after conversion
+        assert len({id(p.shipping[0]) for p in converted}) == 1
+
+        converter.convert(products)
+        assert converter.stats.distinct == 4
+
+    def test_convert_catalog(self):
+        catalog = Catalog(GoogleProduct(**make_row(f, id=str(i), brand='Google')) for i in range(3))
+        converted = CurrencyConverter(RATES, Currency.eur).convert_catalog(catalog)
+
+        assert len(converted) == 3
+        assert converted['1'].price == (Decimal('0.06'), Currency.eur)
+        assert len(converted.by_brand('Google')) == 3
+        assert catalog['1'].price == (Decimal('1.99'), Currency.twd)
+
+    def test_lazy_product(self):
+        product = LazyProduct(**full_row(f))
+        [converted] = CurrencyConverter(RATES, Currency.eur).convert([product])
+
+        assert converted.installment.amount == (Decimal('0.02'), Currency.eur)
+        assert converted.shipping[0].price == (Decimal('1.83'), Currency.eur)
+        assert converted.tax == product.tax
+        assert product.installment.amount == (Decimal('0.5'), Currency.twd)
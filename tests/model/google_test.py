@@ -5,11 +5,13 @@ from operator import is_
 from typing import Tuple
 from faker import Faker
 from iso3166 import countries_by_alpha2
-from pydantic import HttpUrl
+from pydantic import HttpUrl, ValidationError
 from iso4217 import Currency 
+import pytest
 
 from product_feed.model import GoogleProduct
 from product_feed.model.google import AgeGroup, Availability, Condition, Destination, EnergyEfficiency, Gender, Installment, LenUnit, LoyaltyPoints, Pause, ProductDetail, Shipping, SizeSystem, SizeType, SubscriptionCost, Tax, Unit, WeightUnit
+from product_feed.testing import full_row, make_row
 
 f = Faker()
 
@@ -172,3 +174,27 @@ class TestGoogleProduct:
         assert self.full_product.shipping_height == ('20.5', LenUnit.IN)
         assert self.full_product.ships_from_country == countries_by_alpha2['US']
         assert self.full_product.tax == [Tax(country='US', region='CA', rate=Decimal('5.0'), tax_ship=True)]
+
+    def test_shared_nested_values(self):
+        other = GoogleProduct(**full_row(f))
+        assert other.shipping[0] is self.full_product.shipping[0]
+        assert other.tax[0] is self.full_product.tax[0]
+        assert other.price is GoogleProduct(**full_row(f)).price
+        with pytest.raises(TypeError):
+            other.shipping[0].service = 'UPS'
+
+    def test_gtin_check_digit(self):
+        assert GoogleProduct(**make_row(f, gtin='3234567890126')).gtin == ['3234567890126']
+        assert GoogleProduct(**make_row(f, gtin='0-36000-29145-2')).gtin == ['036000291452']
+        with pytest.raises(ValidationError, match='invalid check digit'):
+            GoogleProduct(**make_row(f, gtin='3234567890127'))
+        with pytest.raises(ValidationError, match='8, 12, 13, or 14 digits'):
+            GoogleProduct(**make_row(f, gtin='32345678901'))
+
+    def test_schema(self):
+        schema = GoogleProduct.schema()
+        assert GoogleProduct.schema_json()
+        price = schema['properties']['price']
+        assert price['type'] == 'array'
+        assert 'TWD' in price['items'][1]['enum']
+        assert schema['definitions']['Shipping']['properties']['country']['maxItems'] == 5
@@ -0,0 +1,57 @@
+from datetime import datetime
+import pickle
+
+from faker import Faker
+from pydantic import ValidationError
+import pytest
+
+from product_feed.model import GoogleProduct
+from product_feed.model.lazy import LazyProduct
+from product_feed.testing import make_row
+
+f = Faker()
+
+class TestLazyProduct:
+    def test_deferred_fields(self):
+        product = LazyProduct(**make_row(
+            f,
+            availability_date='2022-10-01T13:00+0800',
+            shipping='US::Fedex:1.99 USD',
+            product_detail='General:Product Type:Digital player',
+        ))
+
+        assert product.pending == {'availability_date', 'shipping', 'product_detail'}
+        assert isinstance(product.availability_date, datetime)
+        assert product.pending == {'shipping', 'product_detail'}
+        assert product.tax is None
+
+    def test_required_fields_are_eager(self):
+        with pytest.raises(ValidationError):
+            LazyProduct(**make_row(f, price='1.99'))
+
+    def test_error_on_access(self):
+        product = LazyProduct(**make_row(f, shipping='US:Fedex'))
+        with pytest.raises(ValidationError):
+            product.shipping
+        with pytest.raises(ValidationError):
+            product.validate_all()
+
+    def test_matches_eager_product(self):
+        data = make_row(
+            f,
+            sale_price_effective_date='2022-10-01T13:00+0800/2022-10-31T13:00+0800',
+            shipping='US::Fedex:1.99 USD',
+            tax='US:CA:5.0:yes',
+            brand='Google',
+        )
+        lazy = LazyProduct(**data)
+        eager = GoogleProduct(**data)
+
+        assert lazy == eager
+        assert list(lazy.dict()) == list(eager.dict())
+        assert not lazy.pending
+
+    def test_pickle(self):
+        product = pickle.loads(pickle.dumps(LazyProduct(**make_row(f, tax='US:CA:5.0:yes'))))
+        assert product.pending == {'tax'}
+        assert product.tax[0].rate == 5
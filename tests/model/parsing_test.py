@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from iso3166 import countries_by_alpha2
+from faker import Faker
+from iso4217 import Currency
+from pydantic import ValidationError
+import dateutil.parser
+import pytest
+
+from product_feed.feed.reader import validate_row
+from product_feed.model import google
+from product_feed.model.lazy import LazyProduct
+from product_feed.model.parsing import (
+    AmountType, CountryType, CurrencyType, DateParser, Interner, ParseCache, cache_stats, parse_amount, parse_country,
+)
+from product_feed.testing import make_row
+
+f = Faker()
+
+class TestParseCache:
+    def test_stats(self):
+        cache = ParseCache(str.upper, maxsize=2)
+        assert cache('a') == 'A'
+        assert cache('a') == 'A'
+        assert cache('b') == 'B'
+        assert cache('c') == 'C'
+        assert cache.stats() == {'hits': 1, 'misses': 3, 'size': 2, 'maxsize': 2}
+
+class TestInterner:
+    def test_shares_instances(self):
+        interner = Interner(lambda v: google.Tax(country=v, rate=Decimal('5')), maxsize=2)
+        assert interner('US') is interner('US')
+        stats = interner.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert stats['saved_bytes'] == interner.created_bytes > 0
+
+    def test_eviction(self):
+        interner = Interner(str.upper, maxsize=2)
+        for v in 'abca':
+            interner(v)
+        assert interner.stats()['size'] == 2
+        assert interner.stats()['misses'] == 4
+        interner.clear()
+        assert interner.stats()['saved_bytes'] == 0
+
+class TestDateParser:
+    def test_fast_path_matches_dateutil(self):
+        parse = DateParser()
+        for value in [
+            '2022-10-01',
+            '2022-10-01T13:00',
+            '2022-10-01T13:00:59',
+            '2022-10-01T13:00:59.25',
+            '2022-10-01T13:00Z',
+            '2022-10-01T13:00+0800',
+            '2022-10-01T13:00-05:30',
+        ]:
+            assert parse(value) == dateutil.parser.parse(value)
+            assert parse(value).utcoffset() == dateutil.parser.parse(value).utcoffset()
+
+        # Every call is counted, cache hits included
+        assert parse.stats()['fast'] == 14
+        assert parse.stats()['fallback'] == 0
+        assert parse.stats()['hits'] == 7
+
+    def test_fallback(self):
+        parse = DateParser()
+        assert parse('Oct 1 2022 1pm') == datetime(2022, 10, 1, 13)
+        assert parse('Oct 1 2022 1pm') == datetime(2022, 10, 1, 13)
+        assert parse('2022-10-01T13:00Z').tzinfo == timezone.utc
+        assert parse.stats()['fast'] == 1
+        assert parse.stats()['fallback'] == 2
+
+class TestParsers:
+    def test_amount(self):
+        assert parse_amount('1.99 USD') == (Decimal('1.99'), Currency.usd)
+        assert parse_amount('1.99 USD') is parse_amount('1.99 USD')
+        assert parse_amount('1.99') is None
+        with pytest.raises(ValueError):
+            parse_amount('abc USD')
+        with pytest.raises(ValueError):
+            parse_amount('1.99 XYZ')
+
+    def test_invalid_decimals(self):
+        row = make_row(f, tax='US:CA:abc:yes', loyalty_points='Plan A:100:abc')
+        with pytest.raises(ValidationError) as e:
+            google.Product(**row)
+        assert [error['loc'] for error in e.value.errors()] == [('loyalty_points',), ('tax',)]
+        assert validate_row(google.Product, 1, row).error.errors() == e.value.errors()
+
+        # Deferred fields report every error as well
+        with pytest.raises(ValidationError) as e:
+            LazyProduct(**row).validate_all()
+        assert {error['loc'] for error in e.value.errors()} == {('loyalty_points',), ('tax',)}
+
+    def test_country(self):
+        assert parse_country('US') == countries_by_alpha2['US']
+        with pytest.raises(ValueError):
+            parse_country('XX')
+
+    def test_lazy_types(self):
+        us = countries_by_alpha2['US']
+        assert CurrencyType.validate('USD') is Currency.usd
+        assert CountryType.validate(us) is us
+        assert CountryType.validate('US') is us
+        assert CountryType.validate(tuple(us)) == us
+        with pytest.raises(ValueError):
+            CountryType.validate('XX')
+        amount = parse_amount('1.99 USD')
+        assert AmountType.validate(amount) is amount
+        assert AmountType.validate('1.99 USD') is amount
+        assert AmountType.validate(('1.99', 'USD')) == amount
+        with pytest.raises(ValueError):
+            AmountType.validate(('abc', 'USD'))
+
+    def test_unit(self):
+        assert google.parse_unit('LBS') == google.Unit.LB
+        assert google.parse_base_measure('15kg') == (15, google.Unit.KG)
+        assert google.parse_base_measure('kg') is None
+
+    def test_cache_stats(self):
+        assert {'datetime', 'amount', 'country', 'unit', 'base_measure', 'shipping', 'tax'} <= set(cache_stats())
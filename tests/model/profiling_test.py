@@ -0,0 +1,51 @@
+from faker import Faker
+from pydantic import ValidationError
+import pytest
+
+from product_feed.model.google import Product, ProductDetail, Shipping
+from product_feed.model.profiling import ValidatorProfiler
+from product_feed.testing import base_row, full_row, make_row
+
+f = Faker()
+
+class TestValidatorProfiler:
+    def test_records_validators(self):
+        with ValidatorProfiler() as profiler:
+            Product(**full_row(f))
+            with pytest.raises(ValidationError):
+                Product(**make_row(f, title='x' * 151))
+
+        stats = profiler.stats()
+        assert stats['Product.title:Product.title_len'] == {
+            'calls': 2, 'errors': 1,
+            'seconds': stats['Product.title:Product.title_len']['seconds'],
+            'mean_seconds': stats['Product.title:Product.title_len']['mean_seconds'],
+        }
+        assert stats['Product.link:AnyUrl.validate']['calls'] == 2
+        assert stats['ProductDetail.__init__']['calls'] > 0
+        assert all(s['seconds'] >= 0 for s in stats.values())
+
+    def test_disable_restores_model(self):
+        validators = Product.__fields__['title'].validators
+        init = ProductDetail.__init__
+        profiler = ValidatorProfiler()
+        profiler.enable()
+        assert profiler.enabled
+        assert Product.__fields__['title'].validators is not validators
+        profiler.disable()
+
+        assert not profiler.enabled
+        assert Product.__fields__['title'].validators is validators
+        assert ProductDetail.__init__ is init
+        assert '__init__' not in Shipping.__dict__
+        Product(**full_row(f))
+        assert profiler.stats() == {}
+
+    def test_prometheus(self):
+        with ValidatorProfiler() as profiler:
+            Product(**base_row(f))
+        text = profiler.prometheus()
+        assert '# TYPE product_feed_validator_calls_total counter' in text
+        assert 'product_feed_validator_calls_total{model="Product",field="id",validator="Product.id_len"} 1' in text
+        profiler.reset()
+        assert 'validator="Product.id_len"' not in profiler.prometheus()
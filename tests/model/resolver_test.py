@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from faker import Faker
+from iso3166 import countries
+from iso4217 import Currency
+
+from product_feed.model import GoogleProduct
+from product_feed.model.currency import CurrencyConverter
+from product_feed.model.google import Shipping, Tax
+from product_feed.model.resolver import DestinationResolver, RuleIndex, cheapest
+from product_feed.testing import make_row
+
+f = Faker()
+
+def shipping(price, **kwargs):
+    return Shipping(country='US', price=f'{price} USD', **kwargs)
+
+class TestRuleIndex:
+    index = RuleIndex([
+        shipping('9.99'),
+        shipping('7.99', region='CA'),
+        shipping('6.99', postal_code='94*'),
+        shipping('5.99', postal_code='940*'),
+        shipping('4.99', postal_code='94002'),
+        shipping('3.99', postal_code='10000-10999'),
+        shipping('2.99', postal_code='1*-2*'),
+        shipping('0.99', location_id='1023191'),
+        Shipping(country='GB', postal_code='SW1A 1AA', price='1.99 GBP'),
+    ])
+
+    def price(self, *destination):
+        return [s.price[0] for s in self.index.match(*destination)]
+
+    def test_most_specific(self):
+        assert self.price('US') == [Decimal('9.99')]
+        assert self.price('US', 'ca') == [Decimal('7.99')]
+        assert self.price('US', 'CA', '94110') == [Decimal('6.99')]
+        assert self.price('US', None, '94010') == [Decimal('5.99')]
+        assert self.price('US', None, '94002') == [Decimal('4.99')]
+
+    def test_ranges(self):
+        assert self.price('US', None, '10000') == [Decimal('3.99')]
+        assert self.price('US', None, '10500') == [Decimal('3.99')]
+        assert self.price('US', None, '10999') == [Decimal('3.99')]
+        assert self.price('US', None, '11000') == [Decimal('2.99')]
+        assert self.price('US', None, '29999') == [Decimal('2.99')]
+        assert self.price('US', None, '30000') == [Decimal('9.99')]
+        assert self.price('US', None, '1050') == [Decimal('2.99')]
+
+    def test_countries(self):
+        assert self.price(countries.get('US')) == [Decimal('9.99')]
+        assert self.price('GB', None, 'sw1a1aa') == [Decimal('1.99')]
+        assert self.price('GB') == []
+        assert self.price('TW') == []
+
+    def test_cheapest(self):
+        index = RuleIndex([shipping('9.99', service='Standard'), shipping('19.99', service='Express')])
+        assert cheapest(index.match('US')).service == 'Standard'
+        assert cheapest(()) is None
+
+    def test_cheapest_currencies(self):
+        services = [
+            Shipping(country='US', service='Yen', price='500 JPY'),
+            Shipping(country='US', service='Euro', price='4.99 EUR'),
+            Shipping(country='US', service='Dollar', price='5.99 USD'),
+        ]
+        assert cheapest(services).service == 'Yen'
+        assert cheapest(services, Currency.usd).service == 'Dollar'
+        assert cheapest(services, Currency.twd).service == 'Yen'
+        converter = CurrencyConverter({Currency.jpy: '0.0068', Currency.eur: '1.1'}, Currency.usd)
+        assert cheapest(services, Currency.usd, converter).service == 'Yen'
+
+    def test_subdivisions(self):
+        index = RuleIndex([
+            Shipping(country='FR', price='9.99 EUR'),
+            Shipping(country='FR', region='FR-75', price='4.99 EUR'),
+            Shipping(country='FR', region='75000-75999', price='2.99 EUR'),
+        ])
+        assert [s.price[0] for s in index.match('FR', 'fr-75')] == [Decimal('4.99')]
+        assert [s.price[0] for s in index.match('FR', None, '75001')] == [Decimal('2.99')]
+        assert [s.price[0] for s in index.match('FR', 'FR-13')] == [Decimal('9.99')]
+
+class TestDestinationResolver:
+    def test_resolve(self):
+        product = GoogleProduct(**make_row(f, shipping='US::Standard:4.99 USD,US:NY:Express:9.99 USD', tax='US:NY:8.875:yes'))
+        resolver = DestinationResolver()
+
+        resolution = resolver.resolve(product, 'US', 'NY', '10001')
+        assert resolution.shipping.service == 'Express'
+        assert resolution.tax.rate == Decimal('8.875')
+        assert len(resolution.services) == 1
+
+        resolution = resolver.resolve(product, 'US', 'CA')
+        assert resolution.shipping.service == 'Standard'
+        assert resolution.tax is None
+
+        assert resolver.resolve(product, 'TW').shipping is None
+
+    def test_product_currency(self):
+        product = GoogleProduct(**make_row(f, price='1.99 USD', shipping='US::Cheap:1 EUR,US::Standard:4.99 USD'))
+        assert DestinationResolver().resolve(product, 'US').shipping.service == 'Standard'
+        assert DestinationResolver().resolve_all([product], 'US')[0].shipping.service == 'Standard'
+        converter = CurrencyConverter({Currency.eur: '1.1'}, Currency.usd)
+        assert DestinationResolver(converter).resolve(product, 'US').shipping.service == 'Cheap'
+
+    def test_resolve_all(self):
+        rows = ['US::Standard:4.99 USD', 'US::Standard:4.99 USD,US:NY:Express:9.99 USD', None]
+        products = [
+            GoogleProduct(**make_row(f, id=str(i), shipping=rows[i % 3], tax='US:NY:8.875:yes'))
+            for i in range(30)
+        ]
+        resolver = DestinationResolver()
+        resolutions = resolver.resolve_all(products, 'US', 'ny')
+
+        assert [r.shipping and r.shipping.service for r in resolutions[:3]] == ['Standard', 'Express', None]
+        assert all(r.tax.rate == Decimal('8.875') for r in resolutions)
+        assert resolutions == [resolver.resolve(p, 'US', 'NY') for p in products]
+        # Two distinct shipping lists and one tax list, however many products hold them
+        assert resolver.stats.rule_sets == 3
+        assert resolver.stats.products == 60
+
+    def test_interned_by_content(self):
+        resolver = DestinationResolver()
+        rules = [Tax(country='US', region='NY', rate='8.875')]
+        assert resolver.index(rules) is resolver.index([Tax(country='US', region='NY', rate='8.875')])
+        assert resolver.index(rules) is not resolver.index([Tax(country='US', region='NY', rate='4')])
+
+        resolver.clear()
+        assert resolver.stats.rule_sets == 2
+        assert resolver.index(None).match('US') == ()
+
+    def test_feed_postal_codes(self):
+        # The second slot of the feed format holds a region or a postal code alike
+        product = GoogleProduct(**make_row(
+            f,
+            shipping='US::Standard:4.99 USD,US:940*:Local:1.99 USD,US:10000-10999:City:2.99 USD,US:CA:Ground:3.99 USD,JP:13:Tokyo:500 JPY',
+            tax='US:94043:9.25:yes,US:CA:7.25:yes',
+        ))
+        resolver = DestinationResolver()
+        resolution = resolver.resolve(product, 'US', 'CA', '94043')
+        assert resolution.shipping.service == 'Local'
+        assert resolution.tax.rate == Decimal('9.25')
+        assert resolver.resolve(product, 'US', 'NY', '10001').shipping.service == 'City'
+        assert resolver.resolve(product, 'US', 'CA', '95014').shipping.service == 'Ground'
+        assert resolver.resolve(product, 'US', 'CA', '95014').tax.rate == Decimal('7.25')
+        assert resolver.resolve(product, 'JP', '13').shipping.service == 'Tokyo'
@@ -0,0 +1,59 @@
+from faker import Faker
+import pytest
+
+from product_feed.model import CompactCatalog, GoogleProduct
+from product_feed.model.snapshot import load_snapshot, write_snapshot
+from product_feed.testing import make_row
+
+f = Faker()
+
+def product(i, **kwargs):
+    return GoogleProduct(**make_row(f, id=str(i), title=f.word() + ' ✓', price=f'{i}.99 TWD', **kwargs))
+
+class TestSnapshot:
+    products = [
+        product(1),
+        product(2, brand='Google', sale_price='1.49 USD', product_length='20.5 in', max_handling_time=3),
+        product(3, shipping='US::Fedex:1.99 USD', tax='US:CA:5.0:yes', availability_date='2022-10-01T13:00+0800'),
+    ]
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / 'catalog.snap'
+        write_snapshot(CompactCatalog(self.products), path)
+
+        catalog = load_snapshot(path)
+        assert len(catalog) == 3
+        assert list(catalog) == self.products
+        assert catalog.get('2').brand == 'Google'
+        assert isinstance(catalog._arrays['price.coef'], memoryview)
+
+    def test_products_iterable(self, tmp_path):
+        path = tmp_path / 'catalog.snap'
+        write_snapshot(self.products, path)
+        assert list(load_snapshot(path)) == self.products
+
+    def test_snapshot_of_snapshot(self, tmp_path):
+        write_snapshot(self.products, tmp_path / 'a.snap')
+        write_snapshot(load_snapshot(tmp_path / 'a.snap'), tmp_path / 'b.snap')
+        assert list(load_snapshot(tmp_path / 'b.snap')) == self.products
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / 'catalog.snap'
+        path.write_bytes(b'not a snapshot at all')
+        with pytest.raises(ValueError):
+            load_snapshot(path)
+
+        for data in (b'short', b'PFSNAP\x00\x00\x01\x00'):
+            path.write_bytes(data)
+            with pytest.raises(ValueError):
+                load_snapshot(path)
+
+    def test_truncated(self, tmp_path):
+        path = tmp_path / 'catalog.snap'
+        write_snapshot(self.products, path)
+        data = path.read_bytes()
+        # Inside the header and inside the last section
+        for end in (20, len(data) - 9):
+            path.write_bytes(data[:end])
+            with pytest.raises(ValueError):
+                load_snapshot(path)
@@ -0,0 +1,50 @@
+from faker import Faker
+import pytest
+
+from product_feed.model.google import Availability, Product, ProductDetail, Shipping
+from product_feed.model.lazy import LazyProduct
+from product_feed.model.trusted import TrustedConstructor
+from product_feed.testing import base_row, full_row
+
+f = Faker()
+
+class TestTrustedConstructor:
+    constructor = TrustedConstructor(check=True)
+
+    def test_from_dict(self):
+        product = Product(**full_row(f))
+        trusted = self.constructor(product.dict())
+
+        assert trusted == product
+        assert trusted.__dict__ == product.__dict__
+        assert isinstance(trusted.shipping[0], Shipping)
+        assert isinstance(trusted.product_detail[0], ProductDetail)
+
+    def test_from_unset_dict(self):
+        product = Product(**base_row(f))
+        trusted = self.constructor(product.dict(exclude_unset=True))
+        assert trusted.__dict__ == product.__dict__
+        assert trusted.__fields_set__ == product.__fields_set__
+
+    def test_from_tuple(self):
+        product = Product(**full_row(f))
+        trusted = self.constructor.from_tuple(tuple(product.__dict__.values()))
+        assert trusted.__dict__ == product.__dict__
+        assert trusted.__fields_set__ == product.__fields_set__
+        with pytest.raises(ValueError):
+            self.constructor.from_tuple(('1',))
+
+    def test_enum_values(self):
+        values = Product(**base_row(f)).dict()
+        assert self.constructor({**values, 'availability': 'in stock'}).availability is Availability.IN_STOCK
+
+    def test_check(self):
+        values = Product(**base_row(f)).dict()
+        with pytest.raises(AssertionError, match='title'):
+            self.constructor({**values, 'title': 'x' * 151})
+        assert TrustedConstructor()({**values, 'title': 'x' * 151}).title == 'x' * 151
+
+    def test_private_attributes(self):
+        product = TrustedConstructor(LazyProduct)(Product(**full_row(f)).dict())
+        assert product.pending == set()
+        assert isinstance(product.shipping[0], Shipping)